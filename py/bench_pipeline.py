@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BENCH_PIPELINE.PY - Offline benchmark for the RenPyTranslatorCore hot path
+Runs process_file over the whole tl/ corpus with a zero-latency identity engine,
+reports lines/sec, segments/sec and time per phase, and compares with a stored baseline.
+The baseline is scaled by a calibration loop timed on both machines, so other hardware
+is not reported as a regression. Regressions only warn unless --strict is given.
+Results are written to bench_output.txt in the repository root.
+Usage: python py/bench_pipeline.py [rounds] [--save-baseline] [--threshold 15] [--strict]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import redirect_stdout
+from pathlib import Path
+
+import translate as pipeline
+
+OUTPUT_FILE = pipeline.REPO_ROOT / "bench_output.txt"
+BASELINE_FILE = Path(__file__).parent / "bench_baseline.json"
+DEFAULT_ROUNDS = 3
+REGRESSION_THRESHOLD = 15    # Flag metrics more than 15% worse than the (calibrated) baseline
+PHASE_MIN_SHARE = 0.05       # Phases under 5% of the run are too noisy to flag
+
+# Calibration: fixed regex/string workload in the style of the hot path, timed on this machine
+CALIBRATION_LINE = '    e "Hello [name], {i}this{/i} is -- a \\"test\\" (of 100%) calibration."\n'
+CALIBRATION_PATTERN = re.compile(r'\[[^\]]*\]|\{[^}]*\}|\([^)]*\)|"((?:[^"\\]|\\.)*)"')
+CALIBRATION_ITERATIONS = 100000
+CALIBRATION_ROUNDS = 5
+
+# Phase -> (owner, method) timed in the instrumented pass
+PHASES = [
+    ('parse', pipeline, 'parse_translation_file'),
+    ('scan', pipeline.RenPyTranslatorCore, '_scan_tags_and_vars'),
+    ('protect', pipeline.RenPyTranslatorCore, '_protect_escapes'),
+    ('restore', pipeline.RenPyTranslatorCore, '_restore_escapes'),
+    ('mappings', pipeline.RenPyTranslatorCore, 'save_mappings'),
+    ('write', pipeline.StreamingOutputWriter, 'write')
+]
+
+def identity(text):
+    """Zero-latency engine; prefixed so the output differs from the input"""
+    return "ID:" + text
+
+def calibrate():
+    """Best-of seconds for the calibration workload - how fast this machine runs this kind of code"""
+    best = None
+    for _ in range(CALIBRATION_ROUNDS):
+        start = time.perf_counter()
+        for _ in range(CALIBRATION_ITERATIONS):
+            CALIBRATION_PATTERN.findall(CALIBRATION_LINE)
+            CALIBRATION_LINE.replace('--', '—').strip().split(' ')
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def corpus_files():
+    return sorted((pipeline.REPO_ROOT / "tl").rglob("*.rpy"))
+
+def run_corpus(files, out_dir, engine=identity):
+    """process_file over every file; returns lines, segments and elapsed seconds"""
+    lines = segments = 0
+    start = time.perf_counter()
+    for path in files:
+        core = pipeline.RenPyTranslatorCore(path, None)
+        core.journal = pipeline.ProgressJournal(core.filename_base, out_dir / "journal")  # Never resume or discard a real run's journal
+        result = core.process_file(engine, out_dir / "id" / f"{core.filename_base}_translated.rpy")
+        core.journal.discard()
+        lines += len(core.model.lines)
+        segments += result['stats']['total_processed']
+    return lines, segments, time.perf_counter() - start
+
+def instrument(phase_times):
+    """Wrap phase functions with timers; returns a timed engine and a function removing the wrappers"""
+    originals = []
+    for phase, owner, name in PHASES:
+        original = getattr(owner, name)
+        originals.append((owner, name, original))
+
+        def timed(*args, _original=original, _phase=phase, **kwargs):
+            start = time.perf_counter()
+            try:
+                return _original(*args, **kwargs)
+            finally:
+                phase_times[_phase] += time.perf_counter() - start
+        setattr(owner, name, timed)
+
+    def engine(text):
+        start = time.perf_counter()
+        translated = identity(text)
+        phase_times['engine'] += time.perf_counter() - start
+        return translated
+
+    def restore():
+        for owner, name, original in originals:
+            setattr(owner, name, original)
+    return engine, restore
+
+def bench(rounds):
+    files = corpus_files()
+
+    # Progress output of process_file is silenced while timing
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        out_dir = Path(tmp)
+        (out_dir / "mappings").mkdir()
+        pipeline.OUTPUT_DIR = out_dir
+
+        # Clean passes: throughput without any timing wrappers
+        best = None
+        for _ in range(rounds):
+            lines, segments, elapsed = run_corpus(files, out_dir)
+            if best is None or elapsed < best:
+                best = elapsed
+
+        # Instrumented pass: where the time goes
+        phase_times = defaultdict(float)
+        engine, restore = instrument(phase_times)
+        try:
+            _, _, instrumented = run_corpus(files, out_dir, engine)
+        finally:
+            restore()
+
+    # Everything not in a named phase: tokenizing and reassembly in _process_line, file reads, hashing
+    phase_times['process_line'] = max(0.0, instrumented - sum(phase_times.values()))
+
+    return {
+        'calibration': calibrate(),
+        'files': len(files),
+        'lines': lines,
+        'segments': segments,
+        'seconds': best,
+        'lines_per_sec': lines / best,
+        'segments_per_sec': segments / best,
+        'phases': {phase: seconds / instrumented * best for phase, seconds in phase_times.items()}
+    }
+
+def compare(result, baseline, threshold):
+    """Lines describing the change against the baseline, scaled to this machine; regressions are marked"""
+    lines = []
+    regressions = 0
+    limit = 1 + threshold / 100
+    
+    # >1 means this machine is slower than the one that recorded the baseline
+    speed = result['calibration'] / baseline['calibration'] if baseline.get('calibration') else 1.0
+    if baseline.get('calibration'):
+        lines.append(f"   calibration: {result['calibration']:.3f}s vs {baseline['calibration']:.3f}s "
+                     f"(baseline scaled by {speed:.2f}x)")
+    else:
+        lines.append("   ⚠️ Baseline has no calibration - comparing raw numbers (re-record with --save-baseline)")
+    
+    for key in ('lines_per_sec', 'segments_per_sec'):
+        expected = baseline[key] / speed
+        ratio = expected / result[key]  # >1 means slower now
+        marker = "❌ REGRESSION" if ratio > limit else "✅"
+        regressions += ratio > limit
+        lines.append(f"   {key}: {result[key]:,.0f} vs {expected:,.0f} ({(1 / ratio - 1) * 100:+.1f}%) {marker}")
+    for phase, seconds in sorted(result['phases'].items()):
+        before = baseline['phases'].get(phase)
+        if not before:
+            continue
+        ratio = seconds / (before * speed)
+        significant = seconds >= result['seconds'] * PHASE_MIN_SHARE
+        marker = "❌ REGRESSION" if ratio > limit and significant else ""
+        regressions += bool(marker)
+        lines.append(f"   {phase}: {seconds:.3f}s vs {before * speed:.3f}s ({(ratio - 1) * 100:+.1f}%) {marker}".rstrip())
+    return lines, regressions
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline process_file benchmark against a stored baseline")
+    parser.add_argument('rounds', type=int, nargs='?', default=DEFAULT_ROUNDS, help="Timed passes, best is kept")
+    parser.add_argument('--save-baseline', action='store_true', help=f"Store this run as {BASELINE_FILE.name}")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="Percent slower than the calibrated baseline that counts as a regression")
+    parser.add_argument('--strict', action='store_true', help="Exit with status 1 on regressions (default: warn)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    rounds = args.rounds
+    result = bench(rounds)
+
+    report = [
+        f"BENCH_PIPELINE {time.strftime('%Y-%m-%d %H:%M:%S')}",
+        f"📄 Corpus: {result['files']} files, {result['lines']} lines, {result['segments']} segments",
+        f"⏱️ process_file: {result['seconds']:.3f}s (best of {rounds}), calibration {result['calibration']:.3f}s",
+        f"🚀 {result['lines_per_sec']:,.0f} lines/sec | {result['segments_per_sec']:,.0f} segments/sec",
+        "📊 Phases:"
+    ]
+    for phase, seconds in sorted(result['phases'].items(), key=lambda item: -item[1]):
+        report.append(f"   {phase:<13} {seconds:.3f}s ({seconds / result['seconds'] * 100:.1f}%)")
+
+    regressions = 0
+    if BASELINE_FILE.exists():
+        with open(BASELINE_FILE, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        comparison, regressions = compare(result, baseline, args.threshold)
+        report.append(f"📐 Baseline ({BASELINE_FILE.name}, recorded {baseline.get('recorded', '?')}):")
+        report += comparison
+
+    if regressions and not args.strict:
+        report.append(f"⚠️ {regressions} metrics over the {args.threshold:g}% threshold (warning only, use --strict to fail)")
+    
+    if args.save_baseline:
+        result['recorded'] = time.strftime('%Y-%m-%d')
+        with open(BASELINE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        report.append(f"💾 Baseline saved: {BASELINE_FILE}")
+
+    text = '\n'.join(report)
+    print(text)
+    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+        f.write(text + '\n')
+
+    sys.exit(1 if regressions and args.strict else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BENCH_PROCESS_LINE.PY - Microbenchmark for RenPyTranslatorCore._process_line
+Runs every line of the tl/ corpus through _process_line with an identity engine
+and reports lines/sec (no network, no sleeps).
+Usage: python py/bench_process_line.py [rounds]
+"""
+
+import sys
+import time
+
+import translate as pipeline
+
+def load_corpus():
+    """Read all .rpy files under tl/"""
+    files = sorted((pipeline.REPO_ROOT / "tl").rglob("*.rpy"))
+    corpus = []
+    for path in files:
+        with open(path, 'r', encoding='utf-8') as f:
+            corpus.append((path, f.read()))
+    return corpus
+
+def bench(corpus, rounds):
+    """Time _process_line over the whole corpus, best of N rounds"""
+    identity = lambda text: text
+    best = None
+    total_lines = 0
+    
+    for _ in range(rounds):
+        total_lines = 0
+        elapsed = 0.0
+        for path, content in corpus:
+            core = pipeline.RenPyTranslatorCore(path, None)
+            core._scan_tags_and_vars(content)
+            lines = content.splitlines(True)
+            
+            start = time.perf_counter()
+            for i, line in enumerate(lines, 1):
+                core._process_line(line, identity, i)
+            elapsed += time.perf_counter() - start
+            total_lines += len(lines)
+        
+        if best is None or elapsed < best:
+            best = elapsed
+    
+    return total_lines, best
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    corpus = load_corpus()
+    total_lines, elapsed = bench(corpus, rounds)
+    
+    print(f"📄 Corpus: {len(corpus)} files, {total_lines} lines")
+    print(f"⏱️ _process_line: {elapsed:.3f}s (best of {rounds})")
+    print(f"🚀 {total_lines / elapsed:,.0f} lines/sec")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LOADTEST_CASCADE.PY - Offline load test of SmartMultiEngineTranslator
+Starts stand-in Bing and Lingva servers (py/standin_server.py), points the engines
+and translate-shell at them and pushes tl/ corpus segments through the cascade.
+Reports throughput, failover, blocking and what the stand-ins answered.
+Google is left out: googletrans speaks Google's private RPC protocol, not a stand-in shape.
+Usage: python py/loadtest_cascade.py [--segments 500] [--rate 20] [--sync] [--balance]
+                                     [standin options: --latency --error-rate --malformed-rate
+                                      --burst-period --burst-length --max-rate --seed]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import requests
+
+import standin_server
+import translate as pipeline
+
+LINGVA_INSTANCES = 3  # Separate stand-ins, so endpoint rotation is exercised
+
+def corpus_segments(limit):
+    """Unique protected segments of the tl/ corpus, in file order"""
+    segments = {}
+    for path in sorted((pipeline.REPO_ROOT / "tl").glob("*.rpy")):
+        core = pipeline.RenPyTranslatorCore(path, None)
+        for segment in core.collect_segments():
+            segments.setdefault(segment, None)
+            if len(segments) >= limit:
+                return list(segments)
+    return list(segments)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline load test of the engine cascade")
+    parser.add_argument('--segments', type=int, default=500, help="Unique corpus segments to translate")
+    parser.add_argument('--rate', type=float, default=20.0, help="Starting req/s per engine (AIMD adjusts it)")
+    parser.add_argument('--sync', action='store_true', help="Use translate_batch instead of the async path")
+    parser.add_argument('--balance', action='store_true', help="Load-balancing mode instead of strict failover")
+    args, standin_argv = parser.parse_known_args(argv)
+    return args, standin_server.parse_args(standin_argv)
+
+def make_profile(standin_args, offset=0):
+    seed = None if standin_args.seed is None else standin_args.seed + offset
+    return standin_server.StandinProfile(standin_args.latency, standin_args.error_rate,
+                                         standin_args.malformed_rate, standin_args.burst_period,
+                                         standin_args.burst_length, standin_args.max_rate, seed)
+
+def main(argv=None):
+    args, standin_args = parse_args(argv)
+
+    servers = {}
+    servers['Bing'], bing_url = standin_server.start_server(make_profile(standin_args))
+    lingva_urls = []
+    for i in range(LINGVA_INSTANCES):
+        servers[f'Lingva {i + 1}'], url = standin_server.start_server(make_profile(standin_args, i + 1))
+        lingva_urls.append(f"{url}/api/v1/en/id")
+
+    # Point the pipeline at the stand-ins before any engine is built
+    pipeline.BING_URL = f"{bing_url}/ttranslatev3"
+    pipeline.LINGVA_ENDPOINTS = lingva_urls
+    pipeline.SHELL_COMMAND = [sys.executable, standin_server.__file__, '--trans',
+                              '--latency', standin_args.latency,
+                              '--error-rate', str(standin_args.error_rate)]
+    pipeline.RATE_START_OTHER = pipeline.RATE_START_SHELL = args.rate
+    pipeline.BALANCE_ENGINES = args.balance
+    pipeline.OUTPUT_DIR = Path(tempfile.mkdtemp(prefix="loadtest_"))
+
+    segments = corpus_segments(args.segments)
+    print(f"🧪 Load test: {len(segments)} segments | Bing {bing_url} | Lingva x{LINGVA_INSTANCES} | fake trans")
+    print(f"   Profile: latency={standin_args.latency} errors={standin_args.error_rate} "
+          f"malformed={standin_args.malformed_rate} burst={standin_args.burst_length}s/{standin_args.burst_period}s "
+          f"max_rate={standin_args.max_rate or 'off'}")
+
+    logger = pipeline.TranslationLogger()
+    translator = pipeline.SmartMultiEngineTranslator(logger, None)
+    translator.engines = [engine for engine in translator.engines if engine.name != 'Google']
+
+    start = time.perf_counter()
+    if args.sync:
+        results = translator.translate_batch(segments)
+    else:
+        results = asyncio.run(translator.translate_batch_async(segments))
+    elapsed = time.perf_counter() - start
+    translator.close()
+    logger.close()
+
+    translated = sum(1 for segment, result in zip(segments, results) if result and result != segment)
+    print(f"⏱️ {elapsed:.1f}s | {len(segments) / elapsed:.1f} segments/sec | "
+          f"{translated}/{len(segments)} translated, {len(segments) - translated} untranslated")
+    translator.print_stats()
+
+    print("📡 Stand-in responses:")
+    for name, server in servers.items():
+        host, port = server.server_address
+        counters = requests.get(f"http://{host}:{port}/stats", timeout=5).json()
+        print(f"   {name}: {json.dumps(counters, sort_keys=True)}")
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
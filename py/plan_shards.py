@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PLAN_SHARDS.PY - Size-aware shard planner for tl/scripts.txt
+Counts translatable segments and characters per file, removes duplicate
+assignments and bin-packs the files into N balanced shards (one per translateN.py).
+Usage: python py/plan_shards.py [shards] [--listed] [--dry-run]
+  --listed   re-plan the files currently in scripts.txt instead of every tl/*.rpy
+  --dry-run  print the plan without writing tl/scripts.txt
+"""
+
+import heapq
+import re
+import sys
+
+import translate as pipeline
+
+SCRIPTS_FILE = pipeline.REPO_ROOT / "tl" / "scripts.txt"
+DEFAULT_SHARDS = 4
+SEGMENT_WEIGHT = 40  # Per-segment cost in characters (request overhead, rate limit slot)
+
+def assigned_files():
+    """Files listed in scripts.txt, each once, in first-seen order"""
+    with open(SCRIPTS_FILE, 'r', encoding='utf-8') as f:
+        listed = re.findall(r'\d+\.\s+(.+\.rpy)', f.read())
+
+    files = list(dict.fromkeys(listed))
+    if len(files) < len(listed):
+        duplicates = sorted({name for name in listed if listed.count(name) > 1})
+        print(f"♻️ Removed duplicate assignments: {', '.join(duplicates)}")
+    return files
+
+def measure(filename):
+    """Translatable segments and characters of one tl file"""
+    with open(pipeline.REPO_ROOT / "tl" / filename, 'r', encoding='utf-8') as f:
+        model = pipeline.parse_translation_file(f.read())
+
+    segments = 0
+    chars = 0
+    for statement in model.statements:
+        segments += len(statement.segments)
+        chars += sum(len(segment) for segment in statement.segments)
+    for block in model.blocks:
+        for statement in block.statements:
+            segments += len(statement.segments)
+            chars += sum(len(segment) for segment in statement.segments)
+        for pair in block.strings:
+            if pair.new is not None:
+                segments += 1
+                chars += len(pair.new)
+    return segments, chars
+
+def cost(segments, chars):
+    return segments * SEGMENT_WEIGHT + chars
+
+def plan(sizes, shard_count):
+    """Longest-processing-time bin packing: biggest file goes to the lightest shard"""
+    shards = [{'files': [], 'segments': 0, 'chars': 0, 'cost': 0} for _ in range(shard_count)]
+    heap = [(0, index) for index in range(shard_count)]
+
+    for filename, (segments, chars) in sorted(sizes.items(), key=lambda item: -cost(*item[1])):
+        _, index = heapq.heappop(heap)
+        shard = shards[index]
+        shard['files'].append(filename)
+        shard['segments'] += segments
+        shard['chars'] += chars
+        shard['cost'] += cost(segments, chars)
+        heapq.heappush(heap, (shard['cost'], index))
+
+    return shards
+
+def write_scripts(shards):
+    """Write shards in the `======= script: [N] =======` format read_my_tasks expects"""
+    sections = []
+    for number, shard in enumerate(shards, 1):
+        lines = [f"======= script: [{number}] ======="]
+        lines += [f"{i}. {filename}" for i, filename in enumerate(shard['files'], 1)]
+        sections.append('\n'.join(lines))
+
+    with open(SCRIPTS_FILE, 'w', encoding='utf-8') as f:
+        f.write('\n\n'.join(sections) + '\n')
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    shard_count = int(args[0]) if args else DEFAULT_SHARDS
+
+    if '--listed' in sys.argv:
+        files = assigned_files()
+    else:
+        files = sorted(path.name for path in (pipeline.REPO_ROOT / "tl").glob("*.rpy"))
+
+    sizes = {}
+    for filename in files:
+        if not (pipeline.REPO_ROOT / "tl" / filename).exists():
+            print(f"⚠️ File not found, skipped: {filename}")
+            continue
+        segments, chars = measure(filename)
+        if not segments:
+            print(f"⚪ No translatable segments, skipped: {filename}")
+            continue
+        sizes[filename] = (segments, chars)
+
+    shards = plan(sizes, shard_count)
+
+    print(f"📄 {len(sizes)} files → {shard_count} shards")
+    for number, shard in enumerate(shards, 1):
+        print(f"   [{number}] {len(shard['files'])} files | {shard['segments']} segments | "
+              f"{shard['chars']:,} chars | cost {shard['cost']:,}")
+    costs = [shard['cost'] for shard in shards]
+    print(f"⚖️ Imbalance: slowest shard is {max(costs) / max(1, min(costs)):.2f}x the fastest")
+    largest = max((cost(*size) for size in sizes.values()), default=0)
+    if largest > sum(costs) / shard_count:
+        print(f"   Largest file alone costs {largest:,} - more than an even share, files are not split")
+
+    if '--dry-run' not in sys.argv:
+        write_scripts(shards)
+        print(f"💾 Saved: {SCRIPTS_FILE}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+STANDIN_SERVER.PY - Local stand-in for the Bing and Lingva translation services
+Speaks the Bing ttranslatev3 and Lingva /api/v1 request/response shapes and injects
+latency, 429 bursts, 5xx errors and malformed JSON, so the engine cascade can be
+load-tested without network. "Translations" are every line prefixed with ID:.
+Usage: python py/standin_server.py [--port 8790] [--latency lognormal:0.15,0.6]
+                                   [--error-rate 0.02] [--malformed-rate 0.01]
+                                   [--burst-period 60 --burst-length 5] [--max-rate 5]
+       python py/standin_server.py --trans [...]   (fake `trans` executable, stdin → stdout)
+Endpoints: POST /ttranslatev3 (form: text, fromLang, toLang)
+           POST /api/v1/<from>/<to> (json: q)   GET /api/v1/<from>/<to>/<query>
+           GET /stats (request counters)
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+DEFAULT_PORT = 8790
+
+class StandinProfile:
+    """Fault and latency settings shared by every request of one server"""
+    def __init__(self, latency='fixed:0', error_rate=0.0, malformed_rate=0.0,
+                 burst_period=0.0, burst_length=0.0, max_rate=0.0, seed=None):
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate          # Share of requests answered with HTTP 500/502/503
+        self.malformed_rate = malformed_rate  # Share of 200 responses with a broken JSON body
+        self.burst_period = burst_period      # Every N seconds...
+        self.burst_length = burst_length      # ...answer everything with 429 for this long
+        self.max_rate = max_rate              # Token bucket over all clients, 429 when exceeded
+        self.random = random.Random(seed)
+        self.started = time.monotonic()
+        self.tokens = max(1.0, max_rate)
+        self.last_refill = self.started
+        self.lock = threading.Lock()
+
+    def delay(self):
+        with self.lock:
+            return self.latency(self.random)
+
+    def in_burst(self):
+        if not self.burst_period:
+            return False
+        return (time.monotonic() - self.started) % self.burst_period < self.burst_length
+
+    def over_rate(self):
+        if not self.max_rate:
+            return False
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.max_rate, self.tokens + (now - self.last_refill) * self.max_rate)
+            self.last_refill = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return False
+            return True
+
+    def roll(self, rate):
+        with self.lock:
+            return self.random.random() < rate
+
+def parse_latency(spec):
+    """fixed:S | uniform:MIN,MAX | lognormal:MEDIAN,SIGMA (seconds) -> sampler(random)"""
+    kind, _, values = spec.partition(':')
+    numbers = [float(value) for value in values.split(',') if value]
+    if kind == 'fixed':
+        return lambda rng: numbers[0] if numbers else 0.0
+    if kind == 'uniform':
+        return lambda rng: rng.uniform(numbers[0], numbers[1])
+    if kind == 'lognormal':
+        mu = math.log(numbers[0])
+        return lambda rng: rng.lognormvariate(mu, numbers[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+def fake_translate(text):
+    """One output line per input line, so batched segments stay aligned"""
+    return '\n'.join(f"ID:{line}" if line.strip() else line for line in text.split('\n'))
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """Bing ttranslatev3 and Lingva /api/v1 shapes with injected faults"""
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like the real services
+
+    def log_message(self, format, *args):
+        pass
+
+    def _count(self, key):
+        with self.server.counter_lock:
+            self.server.counters[key] = self.server.counters.get(key, 0) + 1
+
+    def _send(self, status, body, content_type='application/json', headers=None):
+        payload = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length).decode('utf-8') if length else ''
+
+    def _fault(self, service):
+        """Send an injected failure and return True, or return False to answer normally"""
+        profile = self.server.profile
+        time.sleep(profile.delay())
+
+        if profile.in_burst() or profile.over_rate():
+            self._count(f'{service}_429')
+            self._send(429, json.dumps({'error': 'Too Many Requests'}), headers={'Retry-After': '1'})
+            return True
+        if profile.roll(profile.error_rate):
+            status = profile.random.choice([500, 502, 503])
+            self._count(f'{service}_{status}')
+            self._send(status, '<html><body>Server Error</body></html>', 'text/html')
+            return True
+        return False
+
+    def _reply(self, service, payload):
+        if self.server.profile.roll(self.server.profile.malformed_rate):
+            self._count(f'{service}_malformed')
+            self._send(200, json.dumps(payload)[:-7])  # Truncated body, as seen on dropped connections
+        else:
+            self._count(f'{service}_200')
+            self._send(200, json.dumps(payload, ensure_ascii=False))
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == '/stats':
+            with self.server.counter_lock:
+                self._send(200, json.dumps(self.server.counters, sort_keys=True))
+            return
+
+        parts = path.strip('/').split('/', 4)
+        if len(parts) == 5 and parts[:2] == ['api', 'v1']:
+            self._count('lingva_requests')
+            if not self._fault('lingva'):
+                self._reply('lingva', {'translation': fake_translate(unquote(parts[4]))})
+            return
+        self._send(404, json.dumps({'error': 'Not Found'}))
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        body = self._read_body()
+
+        if path == '/ttranslatev3':
+            self._count('bing_requests')
+            form = parse_qs(body)
+            text = form.get('text', [''])[0]
+            if not self._fault('bing'):
+                to_lang = form.get('toLang', ['id'])[0]
+                self._reply('bing', [{
+                    'detectedLanguage': {'language': form.get('fromLang', ['en'])[0], 'score': 1.0},
+                    'translations': [{'text': fake_translate(text), 'to': to_lang}]
+                }])
+            return
+
+        parts = path.strip('/').split('/')
+        if len(parts) == 4 and parts[:2] == ['api', 'v1']:
+            self._count('lingva_requests')
+            try:
+                text = json.loads(body or '{}').get('q', '')
+            except ValueError:
+                self._send(400, json.dumps({'error': 'Invalid JSON'}))
+                return
+            if not self._fault('lingva'):
+                self._reply('lingva', {'translation': fake_translate(text)})
+            return
+        self._send(404, json.dumps({'error': 'Not Found'}))
+
+def start_server(profile, host='127.0.0.1', port=0):
+    """Serve in a background thread; returns (server, base_url)"""
+    server = ThreadingHTTPServer((host, port), StandinHandler)
+    server.daemon_threads = True
+    server.profile = profile
+    server.counters = {}
+    server.counter_lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+def run_trans(profile):
+    """Fake `trans -brief -no-ansi en:id`: stdin lines → ID: lines, with latency and failures"""
+    text = sys.stdin.read()
+    time.sleep(profile.delay())
+    if profile.roll(profile.error_rate):
+        print("[ERROR] Connection timed out", file=sys.stderr)
+        return 1
+    sys.stdout.write(fake_translate(text.rstrip('\n')) + '\n')
+    return 0
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Local stand-in for Bing/Lingva and translate-shell")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--latency', default='lognormal:0.15,0.6',
+                        help="fixed:S | uniform:MIN,MAX | lognormal:MEDIAN,SIGMA (seconds)")
+    parser.add_argument('--error-rate', type=float, default=0.02, help="Share of HTTP 5xx responses")
+    parser.add_argument('--malformed-rate', type=float, default=0.01, help="Share of truncated JSON bodies")
+    parser.add_argument('--burst-period', type=float, default=60, help="Seconds between 429 bursts (0: off)")
+    parser.add_argument('--burst-length', type=float, default=5, help="Seconds each 429 burst lasts")
+    parser.add_argument('--max-rate', type=float, default=0, help="Requests/sec before 429 (0: unlimited)")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--trans', action='store_true', help="Act as a fake `trans` executable")
+    # trans flags (-brief -no-ansi en:id) are accepted and ignored
+    args, _ = parser.parse_known_args(argv)
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    profile = StandinProfile(args.latency, args.error_rate, args.malformed_rate,
+                             args.burst_period, args.burst_length, args.max_rate, args.seed)
+    if args.trans:
+        sys.exit(run_trans(profile))
+
+    server, url = start_server(profile, port=args.port)
+    print(f"🧪 Stand-in server on {url}")
+    print(f"   Bing:   BING_URL = \"{url}/ttranslatev3\"")
+    print(f"   Lingva: LINGVA_ENDPOINTS = [\"{url}/api/v1/en/id\"]")
+    print(f"   Stats:  {url}/stats")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
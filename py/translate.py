@@ -0,0 +1,3160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TRANSLATE.PY - Smart Blocking Multi-Engine Translation (single entry point)
+Cascade: Google → Bing → Lingva → translate-shell
+Features: Smart blocking + Complete logging + TXT mapping files + Configurable sleep + BATCH PROCESSING
+Repository structure: translate/py/translate.py (translate1-4.py run one shard each)
+Usage: python py/translate.py [--shard N ...] [--workers W] [--balance] [files ...]
+"""
+
+import os
+import re
+import time
+import requests
+import subprocess
+import json
+import argparse
+import multiprocessing
+import multiprocessing.util
+import hashlib
+import gzip
+import shutil
+import sqlite3
+import asyncio
+import threading
+import statistics
+import random
+import email.utils
+import concurrent.futures
+import bisect
+import heapq
+from datetime import datetime, timezone
+from collections import defaultdict, OrderedDict, deque
+from pathlib import Path
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+
+# Get repository root (parent of py/)
+REPO_ROOT = Path(__file__).parent.parent
+
+SCRIPT_NAME = "translate.py"  # Set per shard/worker by main()
+# Adaptive rate limits (token bucket + AIMD), starting requests/sec per engine
+RATE_START_SHELL = 3.0  # For translate-shell
+RATE_START_OTHER = 2.0  # For Google, Bing, Lingva
+# Configurable pattern for scripts.txt
+PATTERN = None  # "[N]" when running a single shard (--shard N)
+OUTPUT_DIR = REPO_ROOT / "output_tl"  # output_N when running a single shard
+
+# ========== NEW: BATCH PROCESSING CONFIG ==========
+BATCH_SIZE = 5      # Former global cadence: 5 files per batch for Google/Bing (kept to report time saved)
+BATCH_DELAY = 20    # 20 seconds cooldown
+
+# ========== PER-ENGINE COOLDOWN CONFIG ==========
+ENGINE_COOLDOWNS = {  # Engine -> (requests, seconds): only that engine pauses after every N requests
+    'Google': (50, BATCH_DELAY),
+    'Bing': (50, BATCH_DELAY)
+}
+
+# ========== LOCAL WORKER POOL CONFIG ==========
+SHARED_RATE_STATE = {}  # Engine name -> shared token bucket, filled in --workers mode
+
+# ========== ADAPTIVE RATE LIMIT CONFIG ==========
+RATE_MIN = 0.05               # Never slower than 1 request per 20s
+RATE_MAX = 10.0               # Never faster than 10 requests/sec
+RATE_BURST = 3                # Token bucket capacity
+RATE_INCREASE_STREAK = 10     # Successes in a row before raising the rate
+RATE_INCREASE_STEP = 0.1      # Additive increase (requests/sec)
+RATE_DECREASE_FACTOR = 0.5    # Multiplicative decrease on rate limit / HTTP 429
+RATE_DECREASE_HOLD = 2.0      # Rate limits this many seconds after a cut belong to the same burst - one cut
+
+# ========== RETRY POLICY CONFIG ==========
+RETRY_POLICIES = {             # Error class -> (retries on the same engine before failover, base backoff seconds)
+    'transient': (2, 0.5),     # Network errors, timeouts, HTTP 5xx, truncated responses
+    'rate_limited': (2, 1.0),  # HTTP 429 - waits at least Retry-After when the service sends one
+    'permanent': (0, 0.0)      # Other HTTP errors, changed response format, missing library
+}
+RETRY_BACKOFF_MAX = 8.0        # Cap of one exponential backoff (full jitter: random sleep up to the cap)
+RETRY_AFTER_MAX = 30.0         # Longer Retry-After: fail over at once and keep the engine paused that long
+
+# ========== CIRCUIT BREAKER CONFIG ==========
+BREAKER_FAILURE_THRESHOLD = 3  # Consecutive failures that open an engine's circuit
+BREAKER_WINDOW = 20            # Recent calls kept for the success-rate rule
+BREAKER_MIN_CALLS = 5          # ...which opens the circuit once this many calls are known
+BREAKER_MIN_SUCCESS = 0.2      # ...and fewer than 20% of them succeeded
+BREAKER_COOLDOWN = 60.0        # Seconds open before a single half-open probe
+BREAKER_COOLDOWN_MAX = 600.0   # Cooldown doubles after every failed probe, up to this
+BREAKER_PROBE_POLL = 1.0       # Re-check interval while another segment's probe is in flight
+BREAKER_GIVE_UP = 900.0        # Seconds with every engine unavailable before segments are left untranslated
+
+# ========== DYNAMIC ENGINE ORDER CONFIG ==========
+DYNAMIC_ORDER = True        # Order the cascade by measured cost instead of Google → Bing → Lingva → Shell
+ORDER_EWMA_ALPHA = 0.2      # Weight of the newest call in the latency and success averages
+ORDER_PRIOR_LATENCY = 1.0   # Seconds per segment assumed for engines not measured yet
+ORDER_MIN_SUCCESS = 0.05    # Success-rate floor, so a failing engine scores high instead of infinite
+ORDER_HYSTERESIS = 0.2      # An engine moves ahead only when its score is 20% better
+ORDER_MIN_CALLS = 5         # Calls before an engine's measurements count; until then it keeps its configured place
+ORDER_DWELL = 5.0           # Seconds an engine order is kept before it is re-evaluated
+ORDER_HISTORY = 10          # Reorder decisions kept for the stats output
+
+# ========== LOAD BALANCING CONFIG ==========
+BALANCE_ENGINES = False  # Spread segments over all healthy engines by sustainable rate (--balance), failover per segment
+
+# ========== HTTP CONNECTION POOL CONFIG ==========
+HTTP_POOL_HOSTS = 10          # Number of per-host pools kept alive
+HTTP_POOL_PER_HOST = 4        # Max connections per host (requests block when exhausted)
+HTTP_POOL_HTTP2 = False       # Use httpx with HTTP/2 when installed (pip install httpx[http2])
+HTTP_USER_AGENT = 'Mozilla/5.0 (Linux; Android 10; K) AppleWebKit/537.36'
+
+# ========== TRANSLATION MEMORY CONFIG ==========
+SOURCE_LANG = "en"
+TARGET_LANG = "id"
+MEMORY_FILE = REPO_ROOT / "cache" / "translation_memory.sqlite3"  # Shared by all scripts
+MEMORY_LRU_SIZE = 5000   # In-process cache entries in front of SQLite
+MEMORY_COMMIT_EVERY = 50 # Commit to disk every N new translations
+
+# ========== CORPUS DEDUPLICATION CONFIG ==========
+DEDUP_CORPUS = True  # Translate each unique segment once across all assigned files
+
+# ========== MULTI-SEGMENT BATCH CONFIG ==========
+BATCH_DELIMITER = "\n"    # Newlines survive Google/Bing/Lingva translation intact
+BATCH_MAX_SEGMENTS = 50   # Max segments packed into a single request
+
+# ========== HEDGED REQUEST CONFIG ==========
+HEDGE_REQUESTS = False        # Send slow segments to the next engine too (async mode only)
+HEDGE_PERCENTILE = 95         # Hedge after the primary exceeds this latency percentile
+HEDGE_MIN_SAMPLES = 20        # Samples needed before the percentile is trusted
+HEDGE_DEFAULT_DELAY = 5.0     # Hedge delay (seconds) until enough samples exist
+HEDGE_MIN_DELAY = 0.5         # Never hedge sooner than this
+LATENCY_WINDOW = 200          # Recent latencies kept per engine
+
+# ========== ENGINE ENDPOINT CONFIG ==========
+# Point these at py/standin_server.py to load-test the cascade offline
+BING_URL = "https://www.bing.com/ttranslatev3"
+LINGVA_ENDPOINTS = [
+    "https://lingva.ml/api/v1/en/id",
+    "https://translate.plausibility.cloud/api/v1/en/id",
+    "https://lingva.lunar.icu/api/v1/en/id"
+]
+
+# ========== LINGVA ENDPOINT POOL CONFIG ==========
+LINGVA_ENDPOINTS_FILE = REPO_ROOT / "lingva_endpoints.txt"  # One URL per line (# comments); replaces LINGVA_ENDPOINTS when present
+LINGVA_TIMEOUT = 20            # Seconds per translation request
+LINGVA_PER_ENDPOINT = 2        # In-flight requests per healthy endpoint (async mode)
+LINGVA_PROBE_TEXT = "Hello"
+LINGVA_PROBE_TIMEOUT = 5       # Seconds per health probe
+LINGVA_PROBE_INTERVAL = 60     # Seconds between background probe rounds
+LINGVA_EWMA_ALPHA = 0.3        # Weight of the newest request in endpoint latency/error averages
+LINGVA_MAX_ERROR_RATE = 0.5    # Endpoint is taken out of rotation above this error rate (until a probe succeeds)
+
+# ========== TRANSLATE-SHELL CONFIG ==========
+SHELL_COMMAND = ['trans', '-brief', '-no-ansi', 'en:id']  # Reads segments from stdin, no shell quoting
+SHELL_TIMEOUT = 25            # Base timeout per trans process (seconds)
+SHELL_TIMEOUT_PER_LINE = 2    # Extra timeout per batched line
+
+# ========== ASYNC ENGINE CONFIG ==========
+ASYNC_ENGINES = True  # Keep several requests in flight instead of one at a time
+ENGINE_CONCURRENCY = {  # Max in-flight requests per engine
+    'Google': 4,
+    'Bing': 2,
+    'Lingva': 3,
+    'Shell': 2
+}
+
+# ========== SESSION LOG CONFIG ==========
+LOG_ROTATE_BYTES = 5 * 1024 * 1024  # Gzip the JSONL session log and start over past this size
+LOG_FLUSH_EVERY = 50                # Log entries between flushes
+LOG_ORIGINS_MAX = 50000             # Segments remembered for file/line attribution
+
+# ========== STAGE TIMING CONFIG ==========
+TIMING_BUCKETS = (0.001, 0.01, 0.1, 1.0, 10.0)  # Histogram upper bounds (seconds), last bucket is open
+TIMING_SLOWEST = 5  # Slowest segments and files listed in the summary
+
+# ========== CHECKPOINT JOURNAL CONFIG ==========
+JOURNAL_DIR = REPO_ROOT / "cache" / "journal"  # Per-file progress journals, removed once a file is saved
+JOURNAL_FSYNC_EVERY = 10  # Completed translate blocks between fsyncs
+
+# ========== PRECOMPILED PATTERNS ==========
+TAG_PATTERN = re.compile(r'\{([^{}]+)\}')              # {i}, {/i}, {color=...}
+VAR_PATTERN = re.compile(r'\[([^\[\]]+)\]')            # [mname], [bname]
+PAREN_PATTERN = re.compile(r'\(([^()]+)\)')              # (smile), (angry)
+IDENTIFIER_PATTERN = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_]*$')
+# One-pass line tokenizer: placeholders, escapes and quotes in a single scan.
+# Only identifier parentheses are tokens - other parentheses never change.
+# Escapes before [ { ( are left alone so the placeholder still matches.
+LINE_TOKEN_PATTERN = re.compile(
+    r'\[(?P<var>[^\[\]]+)\]'
+    r'|\{(?P<tag>[^{}]+)\}'
+    r'|\((?P<paren>[a-zA-Z_][a-zA-Z0-9_]*)\)'
+    r'|(?P<escape>\\[^\[{(])'
+    r'|(?P<quote>")'
+)
+# Escape sequences become single-symbol sentinels (like the dash ©®™ sentinels):
+# one character per escape, nothing an engine would try to translate
+ESCAPE_SENTINELS = {
+    '\\n': '¶',
+    '\\t': '†',
+    '\\"': '‡',
+    '\\\\': '¦',
+    '\\r': '¤',
+    '\\{': '«',
+    '\\}': '»'
+}
+PROTECT_PATTERN = re.compile('|'.join(re.escape(escape) for escape in ESCAPE_SENTINELS))
+RESTORE_ESCAPES = {sentinel: escape for escape, sentinel in ESCAPE_SENTINELS.items()}
+RESTORE_PATTERN = re.compile(r'[¶†‡¦¤»]|«\s*|\{\s+|\s+\}')  # Sentinels + engine-inserted brace whitespace
+SENTINEL_PATTERN = re.compile(r'[¶†‡¦¤»]|«\s*')             # Same, for text without braces (much cheaper)
+
+def _restore_token(match):
+    token = match.group()
+    if token[0] == '«':
+        return '\\{'
+    if token[0] == '{':
+        return '{'
+    if token[-1] == '}':
+        return '}'
+    return RESTORE_ESCAPES[token]
+
+def replace_dashes(text):
+    """Dash characters become ©, ®, ™ so engines leave them alone"""
+    return text.replace('-', '©').replace('–', '®').replace('—', '™')
+
+# ========== UTILITY FUNCTIONS ==========
+
+def read_shard_patterns():
+    """All `[N]` shard patterns listed in tl/scripts.txt"""
+    try:
+        with open(REPO_ROOT / "tl" / "scripts.txt", 'r', encoding='utf-8') as f:
+            return re.findall(r'======= script: (\[\d+\]) =======', f.read())
+    except FileNotFoundError:
+        print(f"❌ File {REPO_ROOT / 'tl' / 'scripts.txt'} not found!")
+        return []
+
+def read_my_tasks(pattern=None):
+    """Read files assigned to a shard (default: this script's PATTERN) from tl/scripts.txt"""
+    try:
+        scripts_file = REPO_ROOT / "tl" / "scripts.txt"
+        with open(scripts_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        pattern = rf'======= script: {re.escape(pattern or PATTERN)} =======\n(.*?)(?=======|$)'
+        match = re.search(pattern, content, re.DOTALL)
+        
+        if match:
+            files_section = match.group(1)
+            files = re.findall(r'\d+\.\s+(.+\.rpy)', files_section)
+            return files
+        return []
+    except FileNotFoundError:
+        print(f"❌ File {REPO_ROOT / 'tl' / 'scripts.txt'} not found!")
+        return []
+    except Exception as e:
+        print(f"❌ Error reading scripts.txt: {e}")
+        return []
+
+def log_message(message):
+    """Log with timestamp"""
+    timestamp = datetime.now().strftime('%H:%M:%S')
+    print(f"[{timestamp}] {SCRIPT_NAME}: {message}")
+
+class RateLimitError(Exception):
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after  # Seconds from the Retry-After header, None when not sent
+
+class EngineCoolingDown(Exception):
+    """Raised instead of sending a request while the engine is in its planned cooldown"""
+    pass
+
+class TranslationError(Exception):
+    pass
+
+class TransientError(TranslationError):
+    """Failure likely to pass on its own (network, timeout, 5xx, truncated body) - worth a retry"""
+    pass
+
+def error_class(error):
+    """RETRY_POLICIES key for an engine error: 'rate_limited', 'transient' or 'permanent'"""
+    if isinstance(error, RateLimitError):
+        return 'rate_limited'
+    if isinstance(error, TransientError):
+        return 'transient'
+    return 'permanent'
+
+def parse_retry_after(value):
+    """Retry-After header (seconds or HTTP date) -> seconds, None when missing or unreadable"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+# ========== ENHANCED LOGGING SYSTEM ==========
+
+class TranslationLogger:
+    """Append-only JSONL session log, streamed as translations happen"""
+    def __init__(self):
+        self.session_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.start_time = datetime.now()
+        self.origins = OrderedDict()  # Protected segment -> (file, line), bounded
+        self.entry_count = 0
+        self.unflushed = 0
+        self.part = 0
+        self.lock = threading.Lock()
+        
+        # Ensure output directories exist
+        output_root = OUTPUT_DIR
+        (output_root / "logs").mkdir(parents=True, exist_ok=True)
+        (output_root / "mappings").mkdir(parents=True, exist_ok=True)
+        (output_root / "id").mkdir(parents=True, exist_ok=True)
+        
+        self.log_file = OUTPUT_DIR / "logs" / f"{SCRIPT_NAME.replace('.py', '')}_session_{self.session_id}.jsonl"
+        self.file = open(self.log_file, 'a', encoding='utf-8')
+        self._write({
+            'event': 'session_start',
+            'session_id': self.session_id,
+            'script_name': SCRIPT_NAME,
+            'pattern': PATTERN,
+            'start_time': self.start_time.isoformat()
+        })
+    
+    def _write(self, entry):
+        """Write one JSON line; caller holds the lock or is single-threaded"""
+        self.file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.unflushed += 1
+        if self.unflushed >= LOG_FLUSH_EVERY:
+            self.file.flush()
+            self.unflushed = 0
+            if self.file.tell() >= LOG_ROTATE_BYTES:
+                self._rotate()
+    
+    def _rotate(self):
+        """Gzip the full log part and continue in a fresh file"""
+        self.file.close()
+        self.part += 1
+        rotated = self.log_file.with_name(f"{self.log_file.stem}.{self.part:03d}.jsonl.gz")
+        while rotated.exists():  # Another session started in the same second
+            self.part += 1
+            rotated = self.log_file.with_name(f"{self.log_file.stem}.{self.part:03d}.jsonl.gz")
+        with open(self.log_file, 'rb') as src, gzip.open(rotated, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        self.file = open(self.log_file, 'w', encoding='utf-8')
+    
+    def attribute(self, text, filename, line_num):
+        """Remember where a segment comes from, so engine log entries name file and line"""
+        with self.lock:
+            if text not in self.origins:
+                self.origins[text] = (filename, line_num)
+                if len(self.origins) > LOG_ORIGINS_MAX:
+                    self.origins.popitem(last=False)
+    
+    def log_translation(self, text, translated, engine, success=True, error=None):
+        """Log individual translation"""
+        with self.lock:
+            # Packed batches are attributed to their first segment
+            origin = self.origins.get(text) or self.origins.get(text.split(BATCH_DELIMITER, 1)[0])
+            filename, line_num = origin or (None, None)
+            self._write({
+                'timestamp': datetime.now().isoformat(),
+                'file': filename,
+                'line': line_num,
+                'original': text,
+                'translated': translated,
+                'engine': engine,
+                'success': success,
+                'error': str(error) if error else None,
+                'length_original': len(text),
+                'length_translated': len(translated) if translated else 0
+            })
+            self.entry_count += 1
+    
+    def save_session_log(self):
+        """Flush entries written so far; the log itself is always on disk"""
+        with self.lock:
+            if self.file:
+                self.file.flush()
+                self.unflushed = 0
+        return str(self.log_file)
+    
+    def close(self):
+        """Write the session summary and close the log"""
+        with self.lock:
+            if not self.file:
+                return
+            self._write({
+                'event': 'session_end',
+                'end_time': datetime.now().isoformat(),
+                'duration_minutes': (datetime.now() - self.start_time).total_seconds() / 60,
+                'total_translations': self.entry_count,
+                'rotated_parts': self.part
+            })
+            self.file.close()
+            self.file = None
+        print(f"📋 Session log saved: {self.log_file}")
+    
+    def log_summary(self, event, data):
+        """Write a summary entry (e.g. stage timings) into the session log"""
+        with self.lock:
+            if self.file:
+                self._write({'event': event, 'timestamp': datetime.now().isoformat(), **data})
+
+# ========== STAGE TIMING ==========
+
+class StageTimer:
+    """Per-stage latency histograms plus the slowest segments and files (thread-safe)"""
+    def __init__(self):
+        self.stages = {}          # Stage -> count, total, max and histogram buckets
+        self.slow_segments = []   # Min-heap of (seconds, stage, text), TIMING_SLOWEST long
+        self.file_times = defaultdict(float)
+        self.lock = threading.Lock()
+    
+    def record(self, stage, seconds, text=None):
+        """Add one sample; engine calls pass the text so slow segments can be listed"""
+        with self.lock:
+            entry = self.stages.get(stage)
+            if entry is None:
+                entry = self.stages[stage] = {'count': 0, 'total': 0.0, 'max': 0.0,
+                                              'buckets': [0] * (len(TIMING_BUCKETS) + 1)}
+            entry['count'] += 1
+            entry['total'] += seconds
+            if seconds > entry['max']:
+                entry['max'] = seconds
+            entry['buckets'][bisect.bisect_left(TIMING_BUCKETS, seconds)] += 1
+            
+            if text is not None:
+                if len(self.slow_segments) < TIMING_SLOWEST:
+                    heapq.heappush(self.slow_segments, (seconds, stage, text))
+                elif seconds > self.slow_segments[0][0]:
+                    heapq.heapreplace(self.slow_segments, (seconds, stage, text))
+    
+    def record_file(self, filename, seconds):
+        with self.lock:
+            self.file_times[filename] += seconds
+    
+    def summary(self):
+        """Plain dict of all timings, for the session log"""
+        with self.lock:
+            return {
+                'buckets': list(TIMING_BUCKETS),
+                'stages': {stage: dict(entry, buckets=list(entry['buckets'])) for stage, entry in self.stages.items()},
+                'slowest_segments': [{'seconds': seconds, 'stage': stage, 'text': text}
+                                     for seconds, stage, text in sorted(self.slow_segments, reverse=True)],
+                'slowest_files': [{'file': filename, 'seconds': seconds}
+                                  for filename, seconds in self.slowest_files()]
+            }
+    
+    def slowest_files(self):
+        return sorted(self.file_times.items(), key=lambda item: -item[1])[:TIMING_SLOWEST]
+
+def _bucket_label(index):
+    if index == len(TIMING_BUCKETS):
+        return f"≥{_format_seconds(TIMING_BUCKETS[-1])}"
+    return f"<{_format_seconds(TIMING_BUCKETS[index])}"
+
+def _format_seconds(seconds):
+    return f"{seconds * 1000:g}ms" if seconds < 1 else f"{seconds:g}s"
+
+TIMINGS = StageTimer()  # Process-wide, each --workers process reports its own
+
+# ========== TRANSLATION MEMORY ==========
+
+class TranslationMemory:
+    """Disk-backed translation memory (SQLite) with in-process LRU tier"""
+    def __init__(self, db_file=MEMORY_FILE, lru_size=MEMORY_LRU_SIZE):
+        self.lang_pair = f"{SOURCE_LANG}:{TARGET_LANG}"
+        self.lru = OrderedDict()
+        self.lru_size = lru_size
+        self.pending_writes = 0
+        self.stats = {
+            'lru_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'stored': 0
+        }
+        
+        Path(db_file).parent.mkdir(parents=True, exist_ok=True)
+        self.db_file = db_file
+        self.conn = sqlite3.connect(str(db_file), timeout=30)  # Worker processes share the file
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS memory ("
+            "source TEXT NOT NULL, "
+            "lang_pair TEXT NOT NULL, "
+            "translated TEXT NOT NULL, "
+            "engine TEXT, "
+            "created_at TEXT, "
+            "PRIMARY KEY (source, lang_pair))"
+        )
+        self.conn.commit()
+    
+    def _remember(self, text, translated):
+        """Put entry in LRU tier, evicting the oldest when full"""
+        self.lru[text] = translated
+        self.lru.move_to_end(text)
+        if len(self.lru) > self.lru_size:
+            self.lru.popitem(last=False)
+    
+    def get(self, text):
+        """Look up protected source text, LRU first then SQLite"""
+        if text in self.lru:
+            self.lru.move_to_end(text)
+            self.stats['lru_hits'] += 1
+            return self.lru[text]
+        
+        row = self.conn.execute(
+            "SELECT translated FROM memory WHERE source = ? AND lang_pair = ?",
+            (text, self.lang_pair)
+        ).fetchone()
+        
+        if row:
+            self.stats['disk_hits'] += 1
+            self._remember(text, row[0])
+            return row[0]
+        
+        self.stats['misses'] += 1
+        return None
+    
+    def put(self, text, translated, engine):
+        """Store successful translation in both tiers"""
+        self._remember(text, translated)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO memory (source, lang_pair, translated, engine, created_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (text, self.lang_pair, translated, engine, datetime.now().isoformat())
+        )
+        self.stats['stored'] += 1
+        self.pending_writes += 1
+        if self.pending_writes >= MEMORY_COMMIT_EVERY:
+            self.conn.commit()
+            self.pending_writes = 0
+    
+    def flush(self):
+        """Commit pending writes (other worker processes see them from now on)"""
+        if self.conn and self.pending_writes:
+            self.conn.commit()
+            self.pending_writes = 0
+    
+    def close(self):
+        """Flush pending writes and close database"""
+        if self.conn:
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
+    
+    def hit_count(self):
+        return self.stats['lru_hits'] + self.stats['disk_hits']
+
+# ========== CHECKPOINT JOURNAL ==========
+
+class ProgressJournal:
+    """Append-only per-file journal of processed lines, committed per translate block"""
+    def __init__(self, filename_base, journal_dir=JOURNAL_DIR):
+        self.journal_file = Path(journal_dir) / f"{filename_base}.jsonl"
+        self.file = None
+        self.completed = {}      # line_num -> processed line, from fully completed blocks
+        self.maps = None         # Placeholder maps of the run that wrote the journal
+        self.pending_blocks = 0
+    
+    def _write(self, entry):
+        self.file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    
+    def load(self, source_hash):
+        """Read completed blocks of a previous run of the same source file"""
+        if not self.journal_file.exists():
+            return self.completed
+        
+        pending = {}
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            for i, raw in enumerate(f):
+                try:
+                    entry = json.loads(raw)
+                except ValueError:
+                    break  # Torn write from a crash, everything after it is lost
+                
+                if i == 0:
+                    if entry.get('source') != source_hash:
+                        log_message(f"⚠️ Stale journal ignored (source changed): {self.journal_file.name}")
+                        return self.completed
+                    self.maps = entry['maps']
+                elif 'block' in entry:
+                    self.completed.update(pending)
+                    pending.clear()
+                else:
+                    pending[entry['line']] = entry['text']
+        
+        return self.completed
+    
+    def open(self, source_hash, maps):
+        """Start a fresh journal holding the completed blocks carried over from the last run"""
+        self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(self.journal_file, 'w', encoding='utf-8')
+        self._write({'source': source_hash, 'maps': maps})
+        for line_num, text in self.completed.items():
+            self._write({'line': line_num, 'text': text})
+        if self.completed:
+            self._write({'block': 'resumed'})
+        self.sync()
+    
+    def record(self, line_num, text):
+        self._write({'line': line_num, 'text': text})
+    
+    def complete_block(self, header_line):
+        """Mark a translate block done; fsync every JOURNAL_FSYNC_EVERY blocks"""
+        self._write({'block': header_line})
+        self.pending_blocks += 1
+        if self.pending_blocks >= JOURNAL_FSYNC_EVERY:
+            self.sync()
+    
+    def sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.pending_blocks = 0
+    
+    def close(self):
+        if self.file:
+            self.sync()
+            self.file.close()
+            self.file = None
+    
+    def discard(self):
+        """File saved - the journal is no longer needed"""
+        self.close()
+        if self.journal_file.exists():
+            self.journal_file.unlink()
+
+# ========== STREAMING OUTPUT WRITER ==========
+
+class StreamingOutputWriter:
+    """Streams output to <name>.part while it is produced, renamed into place on completion"""
+    def __init__(self, output_file):
+        self.output_file = Path(output_file)
+        self.temp_file = self.output_file.with_name(self.output_file.name + '.part')
+        self.file = None
+    
+    def __enter__(self):
+        self.output_file.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(self.temp_file, 'w', encoding='utf-8')
+        return self
+    
+    def write(self, text):
+        self.file.write(text)
+    
+    def flush(self):
+        """Make finished blocks visible in the .part file"""
+        start = time.perf_counter()
+        self.file.flush()
+        TIMINGS.record('write', time.perf_counter() - start)
+    
+    def __exit__(self, exc_type, exc, tb):
+        start = time.perf_counter()
+        if exc_type is None:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        self.file.close()
+        
+        # A failed run leaves the .part file behind for inspection
+        if exc_type is None:
+            os.replace(self.temp_file, self.output_file)
+            TIMINGS.record('write', time.perf_counter() - start)
+        return False
+
+# ========== RENPY TRANSLATION FILE MODEL ==========
+TL_HEADER_PATTERN = re.compile(r'translate\s+(\S+)\s+(.+?)\s*:\s*$')  # translate english label_id:
+QUOTED_PATTERN = re.compile(r'"((?:[^"\\]|\\.)*)"')                   # "text" (escaped quotes stay inside)
+
+class TranslateBlock:
+    """One `translate <language> <label>:` block of a tl file"""
+    __slots__ = ('language', 'label', 'line_num', 'comments', 'statements', 'strings')
+
+    def __init__(self, language, label, line_num):
+        self.language = language
+        self.label = label
+        self.line_num = line_num
+        self.comments = []    # Line numbers of `# ...` lines inside the block
+        self.statements = []  # DialogueStatement nodes
+        self.strings = []     # StringPair nodes (strings blocks only)
+
+    @property
+    def is_strings(self):
+        return self.label == 'strings'
+
+    @property
+    def is_dialogue(self):
+        return self.label != 'strings' and IDENTIFIER_PATTERN.match(self.label) is not None
+
+class DialogueStatement:
+    """Quoted statement line: `speaker "text"` or narration `"text"`"""
+    __slots__ = ('line_num', 'speaker', 'segments')
+
+    def __init__(self, line_num, speaker, segments):
+        self.line_num = line_num
+        self.speaker = speaker
+        self.segments = segments
+
+class StringPair:
+    """old/new entry of a `translate <language> strings:` block"""
+    __slots__ = ('old_line', 'old', 'new_line', 'new')
+
+    def __init__(self, old_line, old):
+        self.old_line = old_line
+        self.old = old
+        self.new_line = None
+        self.new = None
+
+class TranslationFileModel:
+    """Parsed tl file: raw lines, blocks and the lines worth translating"""
+    __slots__ = ('lines', 'blocks', 'comments', 'statements', 'translatable', 'owners')
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.blocks = []
+        self.comments = []      # Comment lines outside any block
+        self.statements = []    # Quoted statements outside any block (plain .rpy files)
+        self.translatable = []  # Line numbers the translation stage touches, in order
+        self.owners = []        # Header line of the block owning each translatable line
+
+    def block_ends(self):
+        """Translatable line numbers that complete their block, mapped to the block header line"""
+        ends = {}
+        owners = self.owners
+        for index, line_num in enumerate(self.translatable):
+            if index + 1 == len(owners) or owners[index + 1] != owners[index]:
+                ends[line_num] = owners[index]
+        return ends
+
+    def translatable_text(self):
+        """Only the lines the translation stage touches, for placeholder scanning"""
+        lines = self.lines
+        return ''.join(lines[line_num - 1] for line_num in self.translatable)
+
+def parse_translation_file(content):
+    """Build the block model of a tl file in one linear pass"""
+    model = TranslationFileModel(content.splitlines(True))
+    block = None
+    pending_old = None
+
+    for line_num, line in enumerate(model.lines, 1):
+        stripped = line.strip()
+        if not stripped:
+            continue
+
+        if stripped[0] == '#':
+            (block.comments if block else model.comments).append(line_num)
+            continue
+
+        if line[0] not in ' \t':
+            header = TL_HEADER_PATTERN.match(stripped) if stripped.startswith('translate ') else None
+            if header:
+                block = TranslateBlock(header.group(1), header.group(2), line_num)
+                model.blocks.append(block)
+                pending_old = None
+                continue
+            block = None
+
+        if '"' not in stripped or stripped[0] == '$':
+            continue
+
+        speaker = stripped[:stripped.index('"')].strip()
+        segments = QUOTED_PATTERN.findall(stripped)
+
+        if block is None:
+            model.statements.append(DialogueStatement(line_num, speaker, segments))
+            model.translatable.append(line_num)
+            model.owners.append(line_num)
+        elif block.is_strings:
+            # `old` is the source key Ren'Py matches on - only `new` is translated
+            if speaker == 'old':
+                pending_old = StringPair(line_num, segments[0] if segments else '')
+                block.strings.append(pending_old)
+            elif speaker == 'new' and pending_old is not None:
+                pending_old.new_line = line_num
+                pending_old.new = segments[0] if segments else ''
+                model.translatable.append(line_num)
+                model.owners.append(block.line_num)
+                pending_old = None
+        elif block.is_dialogue:
+            block.statements.append(DialogueStatement(line_num, speaker, segments))
+            model.translatable.append(line_num)
+            model.owners.append(block.line_num)
+
+    return model
+
+# ========== CORE RENPY TRANSLATOR ==========
+
+class RenPyTranslatorCore:
+    """Enhanced Core RenPy translation logic with TXT mapping export"""
+    
+    def __init__(self, input_file, logger):
+        self.input_file = Path(input_file)
+        self.filename_base = self.input_file.stem
+        self.tag_map = defaultdict(str)
+        self.var_map = defaultdict(str)
+        self.parentheses_map = defaultdict(str)  # For (smile) type mappings
+        self.tag_counter = 1
+        self.var_counter = 1
+        self.paren_counter = 1
+        self.logger = logger
+        self.model = None  # TranslationFileModel, parsed once per file
+        self.source_hash = None
+        self.journal = ProgressJournal(self.filename_base)
+        
+        # Translation stats
+        self.stats = {
+            'success': 0,
+            'failed': 0,
+            'skipped_code': 0,
+            'total_processed': 0,
+            'resumed': 0
+        }
+        
+        # RenPy keywords yang TIDAK boleh ditranslate
+        self.skip_keywords = [
+            'show ', 'scene ', 'play ', 'stop ', 'queue ',
+            'image ', 'define ', 'transform ', 'screen ',
+            'jump ', 'call ', 'return', 'menu:', 'if ',
+            'python:', 'init ', 'label ', 'with ',
+            'hide ', 'at ', 'as ', '$', 'pause',
+            'nvl ', 'window ', 'voice ', 'sound ',
+            'music ', 'audio ', 'renpy.', 'camera '
+        ]
+        self.skip_prefixes = tuple(keyword.lower() for keyword in self.skip_keywords)
+
+    def _protect_escapes(self, text):
+        """Protect escape sequences during translation"""
+        if '\\' not in text:
+            return text
+        return PROTECT_PATTERN.sub(lambda m: ESCAPE_SENTINELS[m.group()], text)
+
+    def _restore_escapes(self, text):
+        """Restore escape sequences after translation"""
+        if '{' in text or '}' in text:
+            return RESTORE_PATTERN.sub(_restore_token, text)
+        return SENTINEL_PATTERN.sub(_restore_token, text)
+
+    def _should_translate(self, before_quote, text_content):
+        """Check if text should be translated based on context"""
+        before_quote = before_quote.strip().lower()
+
+        if before_quote.startswith(self.skip_prefixes):
+            return False
+
+        if '$' in before_quote:
+            return False
+
+        if before_quote.endswith(':'):
+            return False
+
+        if (text_content.endswith(('.png', '.jpg', '.mp3', '.ogg', '.wav')) or
+            '/' in text_content or '\\' in text_content):
+            return False
+
+        return True
+
+    def _scan_tags_and_vars(self, content):
+        """Scan and map tags, variables, and parentheses"""
+        # Scan tags {i}, {/i}, etc.
+        for tag in dict.fromkeys(TAG_PATTERN.findall(content)):  # First-appearance order: same placeholders in every process
+            if tag not in self.tag_map:
+                self.tag_map[tag] = str(self.tag_counter)
+                self.tag_counter += 1
+        
+        # Scan variables [mname], [bname], etc.
+        for var in dict.fromkeys(VAR_PATTERN.findall(content)):
+            if var not in self.var_map:
+                self.var_map[var] = str(self.var_counter)
+                self.var_counter += 1
+        
+        # Scan parentheses (smile), (angry), etc.
+        for paren in dict.fromkeys(PAREN_PATTERN.findall(content)):
+            # Only map parentheses that look like expressions, not regular text
+            if IDENTIFIER_PATTERN.match(paren):  # Simple identifier pattern
+                if paren not in self.parentheses_map:
+                    self.parentheses_map[paren] = str(self.paren_counter)
+                    self.paren_counter += 1
+
+    def _translate_single_text(self, text, translate_function, line_num=0):
+        """Wrapper to handle single text translation with logging"""
+        self.stats['total_processed'] += 1
+
+        if not text or not text.strip():
+            return text
+
+        # Protect escape sequences
+        start = time.perf_counter()
+        protected_text = self._protect_escapes(text)
+        TIMINGS.record('protect', time.perf_counter() - start)
+        if self.logger:
+            self.logger.attribute(protected_text, self.filename_base, line_num)
+
+        try:
+            translated = translate_function(protected_text)
+            
+            if not translated or translated == protected_text:
+                self.stats['failed'] += 1
+                return text
+                
+            # Restore escape sequences
+            start = time.perf_counter()
+            final_text = self._restore_escapes(translated)
+            TIMINGS.record('restore', time.perf_counter() - start)
+            self.stats['success'] += 1
+            return final_text
+            
+        except Exception as e:
+            print(f"⚠️ Translation error: {e}")
+            self.stats['failed'] += 1
+            return text
+
+    def _tag_placeholder(self, tag):
+        """Tag placeholder; variables inside the tag are substituted before lookup"""
+        if '[' in tag:
+            tag = VAR_PATTERN.sub(lambda m: f"[{self.var_map.get(m.group(1), '?')}]", tag)
+        return f"{{{self.tag_map.get(tag, '?')}}}"
+
+    def _process_line(self, line, translate_function, line_num):
+        """Process single line in one pass: placeholders, dashes and quoted text"""
+        original_line = line.rstrip()
+        stripped = original_line.strip()
+        if not stripped or stripped[0] in '#$':
+            return line
+
+        pieces = []         # Processed line so far
+        append = pieces.append
+        quote_start = None  # Index in pieces where the open quoted text starts
+        before_quote = ''
+
+        # split() yields: text, var, tag, paren, escape, quote, text, ...
+        tokens = LINE_TOKEN_PATTERN.split(original_line)
+        for i in range(0, len(tokens) - 1, 6):
+            text, var, tag, paren, escape, quote = tokens[i:i + 6]
+            if text:
+                append(replace_dashes(text))
+
+            if quote:
+                if quote_start is None:
+                    before_quote = ''.join(pieces)
+                    append('"')
+                    quote_start = len(pieces)
+                else:
+                    text = ''.join(pieces[quote_start:])
+                    del pieces[quote_start:]
+                    if self._should_translate(before_quote, text):
+                        text = self._translate_single_text(text, translate_function, line_num)
+                    else:
+                        self.stats['skipped_code'] += 1
+                    append(text)
+                    append('"')
+                    quote_start = None
+            elif var is not None:
+                append(f"[{self.var_map.get(var, '?')}]")
+            elif tag is not None:
+                append(self._tag_placeholder(tag))
+            elif paren is not None:
+                append(f"({self.parentheses_map.get(paren, paren)})")
+            else:
+                append(replace_dashes(escape))
+
+        if tokens[-1]:
+            append(replace_dashes(tokens[-1]))
+
+        return ''.join(pieces) + '\n'
+
+    def load_model(self):
+        """Parse the file into its block model and map placeholders of translatable lines"""
+        if self.model is None:
+            with open(self.input_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+            self.model = parse_translation_file(content)
+            self.source_hash = hashlib.sha1(content.encode('utf-8')).hexdigest()
+            
+            # Resumed lines were written with the previous run's placeholder numbers
+            if self.journal.load(self.source_hash) and self.journal.maps:
+                self._restore_maps(self.journal.maps)
+                log_message(f"♻️ Resuming {self.filename_base}: {len(self.journal.completed)} lines already done")
+            else:
+                start = time.perf_counter()
+                self._scan_tags_and_vars(self.model.translatable_text())
+                TIMINGS.record('scan', time.perf_counter() - start)
+        return self.model
+
+    def _current_maps(self):
+        return {'tag': self.tag_map, 'var': self.var_map, 'paren': self.parentheses_map}
+
+    def _restore_maps(self, maps):
+        """Reuse placeholder numbering recorded in the journal"""
+        self.tag_map = defaultdict(str, maps['tag'])
+        self.var_map = defaultdict(str, maps['var'])
+        self.parentheses_map = defaultdict(str, maps['paren'])
+        self.tag_counter = len(self.tag_map) + 1
+        self.var_counter = len(self.var_map) + 1
+        self.paren_counter = len(self.parentheses_map) + 1
+
+    def collect_segments(self):
+        """Planning pass: extract protected translatable segments without translating"""
+        if not self.input_file.exists():
+            return []
+        
+        model = self.load_model()
+        
+        segments = []
+        def collect(protected_text):
+            segments.append(protected_text)
+            return protected_text
+        
+        lines = model.lines
+        completed = self.journal.completed
+        for i in model.translatable:
+            if i not in completed:
+                self._process_line(lines[i - 1], collect, i)
+        
+        # Planning must not count towards translation stats
+        for key in self.stats:
+            self.stats[key] = 0
+        
+        return segments
+
+    async def process_file_async(self, translate_async_function, output_file):
+        """Submit all segments of the file at once, then reassemble lines in order"""
+        segments = list(dict.fromkeys(self.collect_segments()))
+        print(f"📨 Submitting {len(segments)} unique segments of {self.filename_base} concurrently...")
+        
+        translated = await asyncio.gather(*(translate_async_function(segment) for segment in segments))
+        lookup = dict(zip(segments, translated))
+        
+        return self.process_file(lambda text: lookup.get(text, text), output_file)
+
+    def save_mappings(self):
+        """Save tag and variable mappings to TXT file"""
+        mapping_file = OUTPUT_DIR / "mappings" / f"{self.filename_base}_mapping.txt"
+        
+        with open(mapping_file, 'w', encoding='utf-8') as f:
+            # Write tag mappings
+            if self.tag_map:
+                f.write("=== TAG MAPPING ===\n")
+                for original, mapped in sorted(self.tag_map.items(), key=lambda x: int(x[1])):
+                    f.write(f"{{{mapped}}} = {{{original}}}\n")
+                f.write("\n")
+            
+            # Write variable mappings
+            if self.var_map:
+                f.write("=== VARIABLE MAPPING ===\n")
+                for original, mapped in sorted(self.var_map.items(), key=lambda x: int(x[1])):
+                    f.write(f"[{mapped}] = [{original}]\n")
+                f.write("\n")
+            
+            # Write parentheses mappings
+            if self.parentheses_map:
+                f.write("=== KURUNG MAPPING ===\n")
+                for original, mapped in sorted(self.parentheses_map.items(), key=lambda x: int(x[1])):
+                    f.write(f"({mapped}) = ({original})\n")
+        
+        print(f"🗺️ Mappings saved: {mapping_file}")
+        return str(mapping_file)
+
+    def process_file(self, translate_function, output_file):
+        """Process single file with provided translate function, streaming lines to output_file"""
+        print(f"🔸 Processing {self.filename_base}...")
+        started = time.perf_counter()
+        
+        if not self.input_file.exists():
+            print(f"❌ File not found: {self.input_file}")
+            return None
+        
+        try:
+            # Parse blocks, scan tags, variables, and parentheses
+            model = self.load_model()
+            print(f"📋 Found {len(model.blocks)} blocks, {len(model.translatable)} translatable lines")
+            print(f"📋 Found {len(self.tag_map)} tags, {len(self.var_map)} variables, {len(self.parentheses_map)} parentheses")
+            
+            # Save mappings
+            mapping_file = self.save_mappings()
+            
+            # Only translatable lines are processed - everything else is re-emitted as is
+            translatable = model.translatable
+            total_lines = len(translatable)
+            completed = self.journal.completed
+            block_ends = model.block_ends()
+            self.journal.open(self.source_hash, self._current_maps())
+            done = 0
+            
+            with StreamingOutputWriter(output_file) as writer:
+                for i, line in enumerate(model.lines, 1):
+                    if done == total_lines or translatable[done] != i:
+                        writer.write(line)
+                        continue
+                    
+                    done += 1
+                    if i in completed:
+                        writer.write(completed[i])
+                        self.stats['resumed'] += 1
+                    else:
+                        line = self._process_line(line, translate_function, i)
+                        writer.write(line)
+                        self.journal.record(i, line)
+                        if i in block_ends:
+                            self.journal.complete_block(block_ends[i])
+                            writer.flush()
+                    
+                    # Progress update
+                    if done % 50 == 0 or done == total_lines:
+                        percent = (done / total_lines) * 100
+                        success_rate = (self.stats['success'] / max(1, self.stats['total_processed'])) * 100
+                        print(f"  {percent:.0f}% | {done}/{total_lines} | Success: {success_rate:.0f}%")
+            
+            self.journal.close()
+            TIMINGS.record_file(self.filename_base, time.perf_counter() - started)
+            
+            print(f"✅ {self.filename_base} completed!")
+            print(f"   Success: {self.stats['success']} | Failed: {self.stats['failed']} | Skipped: {self.stats['skipped_code']}")
+            if self.stats['resumed']:
+                print(f"   Resumed from journal: {self.stats['resumed']} lines")
+            
+            return {
+                'filename': self.filename_base,
+                'output_file': str(output_file),
+                'stats': self.stats.copy(),
+                'mapping_file': mapping_file
+            }
+            
+        except Exception as e:
+            self.journal.close()
+            print(f"❌ Error processing {self.filename_base}: {e}")
+            return None
+
+# ========== SHARED HTTP CONNECTION POOL ==========
+
+class HttpClientPool:
+    """Process-wide keep-alive HTTP client shared by all engines"""
+    def __init__(self):
+        self.http2 = False
+        self.errors = (requests.RequestException,)
+        self.request_counts = defaultdict(int)
+        self.lock = threading.Lock()
+        
+        self.client = self._create_http2_client() if HTTP_POOL_HTTP2 else None
+        if self.client is None:
+            self.client = self._create_session()
+    
+    def _create_session(self):
+        """requests session with bounded keep-alive pools (gzip is on by default)"""
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=HTTP_POOL_HOSTS,
+            pool_maxsize=HTTP_POOL_PER_HOST,
+            pool_block=True
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({
+            'User-Agent': HTTP_USER_AGENT,
+            'Accept-Encoding': 'gzip, deflate'
+        })
+        return session
+    
+    def _create_http2_client(self):
+        """Optional httpx client with HTTP/2, None when httpx/h2 is unavailable"""
+        try:
+            import httpx
+            client = httpx.Client(
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=HTTP_POOL_HOSTS * HTTP_POOL_PER_HOST,
+                    max_keepalive_connections=HTTP_POOL_HOSTS * HTTP_POOL_PER_HOST
+                ),
+                headers={
+                    'User-Agent': HTTP_USER_AGENT,
+                    'Accept-Encoding': 'gzip, deflate'
+                }
+            )
+        except (ImportError, AttributeError, TypeError) as e:
+            log_message(f"⚠️ HTTP/2 unavailable ({e}), using requests keep-alive pool")
+            return None
+        
+        self.http2 = True
+        self.errors = (requests.RequestException, httpx.HTTPError)
+        return client
+    
+    def post(self, url, **kwargs):
+        """POST through the shared pool"""
+        host = urlsplit(url).netloc
+        with self.lock:
+            self.request_counts[host] += 1
+        return self.client.post(url, **kwargs)
+    
+    def connection_stats(self):
+        """Per-host requests vs new connections (reused = requests - connections)"""
+        connections = {}
+        if not self.http2:
+            for adapter in set(self.client.adapters.values()):  # Same adapter is mounted for http and https
+                pools = adapter.poolmanager.pools
+                for key in pools.keys():
+                    pool = pools[key]
+                    # By host:port, so local instances on one host are told apart, and by host alone
+                    for name in (f"{pool.host}:{pool.port}", pool.host):
+                        connections[name] = connections.get(name, 0) + pool.num_connections
+        
+        stats = {}
+        for host, count in self.request_counts.items():
+            opened = connections.get(host)
+            stats[host] = {
+                'requests': count,
+                'connections': opened,
+                'reused': count - opened if opened is not None else None
+            }
+        return stats
+
+_HTTP_POOL = None
+
+def get_http_pool():
+    """Shared HTTP pool, created once per process"""
+    global _HTTP_POOL
+    if _HTTP_POOL is None:
+        _HTTP_POOL = HttpClientPool()
+    return _HTTP_POOL
+
+# ========== ADAPTIVE RATE LIMITER ==========
+
+def create_shared_rate_state():
+    """Token buckets in shared memory, one per engine, for --workers mode"""
+    starts = {'Google': RATE_START_OTHER, 'Bing': RATE_START_OTHER,
+              'Lingva': min(RATE_MAX, RATE_START_OTHER * max(1, len(load_lingva_endpoints()))), 'Shell': RATE_START_SHELL}
+    return {name: multiprocessing.Array('d', [rate, 1.0, time.monotonic(), 0, 0.0, 0.0])
+            for name, rate in starts.items()}
+
+class RateLimiter:
+    """Per-engine token bucket with AIMD rate adjustment and request-count cooldowns
+    (thread-safe, process-shared in --workers mode)"""
+    RATE, TOKENS, LAST_REFILL, REQUESTS, COOL_UNTIL, LAST_DECREASE = 0, 1, 2, 3, 4, 5  # Bucket state slots
+    
+    def __init__(self, name, rate, burst=RATE_BURST):
+        self.name = name
+        self.burst = burst
+        self.success_streak = 0
+        self.cooldown = ENGINE_COOLDOWNS.get(name)  # (requests, seconds) or None
+        shared = SHARED_RATE_STATE.get(name)
+        if shared is not None:
+            # All worker processes draw from the same bucket and see each other's AIMD changes and cooldowns
+            self.state = shared
+            self.lock = shared.get_lock()
+        else:
+            self.state = [rate, 1.0, time.monotonic(), 0, 0.0, 0.0]
+            self.lock = threading.Lock()
+        self.stats = {
+            'waits': 0,
+            'wait_time': 0.0,
+            'increases': 0,
+            'decreases': 0,
+            'cooldowns': 0,
+            'cooldown_time': 0.0
+        }
+    
+    @property
+    def rate(self):
+        return self.state[self.RATE]
+    
+    def _refill(self):
+        state = self.state
+        now = time.monotonic()
+        state[self.TOKENS] = min(self.burst, state[self.TOKENS] + (now - state[self.LAST_REFILL]) * state[self.RATE])
+        state[self.LAST_REFILL] = now
+    
+    def cooling_remaining(self):
+        """Seconds left in this engine's cooldown (0 when it may send)"""
+        return max(0.0, self.state[self.COOL_UNTIL] - time.monotonic())
+    
+    def defer(self, seconds):
+        """Hold every caller of this engine off for seconds (Retry-After), like a cooldown"""
+        with self.lock:
+            self.state[self.COOL_UNTIL] = max(self.state[self.COOL_UNTIL], time.monotonic() + seconds)
+    
+    def _count_request(self):
+        """Start the engine's cooldown after every N requests; caller holds the lock"""
+        state = self.state
+        state[self.REQUESTS] += 1
+        if self.cooldown and state[self.REQUESTS] >= self.cooldown[0]:
+            requests, seconds = self.cooldown
+            state[self.REQUESTS] = 0
+            state[self.COOL_UNTIL] = time.monotonic() + seconds
+            self.stats['cooldowns'] += 1
+            self.stats['cooldown_time'] += seconds
+            log_message(f"🧊 {self.name} cooling down for {seconds}s after {requests} requests (other engines keep going)")
+    
+    def acquire(self):
+        """Take one token, sleeping only while the bucket is empty.
+        Raises EngineCoolingDown instead of waiting out a cooldown, so the caller can use another engine."""
+        while True:
+            with self.lock:
+                remaining = self.state[self.COOL_UNTIL] - time.monotonic()
+                if remaining > 0:
+                    raise EngineCoolingDown(f"{self.name} cooling down for another {remaining:.0f}s")
+                self._refill()
+                if self.state[self.TOKENS] >= 1:
+                    self.state[self.TOKENS] -= 1
+                    self._count_request()
+                    return
+                wait = (1 - self.state[self.TOKENS]) / self.state[self.RATE]
+                self.stats['waits'] += 1
+                self.stats['wait_time'] += wait
+            start = time.perf_counter()
+            time.sleep(wait)
+            TIMINGS.record('sleep', time.perf_counter() - start)
+    
+    def expected_wait(self):
+        """Seconds until a token is available, without taking one (rate-limit headroom)"""
+        with self.lock:
+            state = self.state
+            tokens = min(self.burst, state[self.TOKENS] + (time.monotonic() - state[self.LAST_REFILL]) * state[self.RATE])
+            return max(0.0, (1 - tokens) / state[self.RATE])
+    
+    def record_success(self):
+        """Additive increase after a streak of successes"""
+        with self.lock:
+            self.success_streak += 1
+            if self.success_streak >= RATE_INCREASE_STREAK:
+                self.success_streak = 0
+                if self.state[self.RATE] < RATE_MAX:
+                    self.state[self.RATE] = min(RATE_MAX, self.state[self.RATE] + RATE_INCREASE_STEP)
+                    self.stats['increases'] += 1
+    
+    def record_rate_limited(self):
+        """Multiplicative decrease and empty bucket on rate limit; a burst of 429s cuts the rate once"""
+        with self.lock:
+            self.success_streak = 0
+            self.state[self.TOKENS] = 0
+            now = time.monotonic()
+            if now - self.state[self.LAST_DECREASE] < RATE_DECREASE_HOLD:
+                return  # Answer to a request sent before the last cut took effect
+            self.state[self.LAST_DECREASE] = now
+            self.state[self.RATE] = max(RATE_MIN, self.state[self.RATE] * RATE_DECREASE_FACTOR)
+            self.stats['decreases'] += 1
+        log_message(f"🐢 {self.name} rate cut to {self.rate:.2f} req/s")
+
+# ========== ENGINE CIRCUIT BREAKER ==========
+
+class CircuitBreaker:
+    """Per-engine circuit: closed → open (timed cooldown) → half-open (one probe) → closed or open again"""
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half-open'
+    CALL = 'call'  # allow() token of an ordinary call while closed
+    
+    def __init__(self, name, logger=None):
+        self.name = name
+        self.logger = logger
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.outcomes = deque(maxlen=BREAKER_WINDOW)  # True = success
+        self.cooldown = BREAKER_COOLDOWN
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.probe_token = None  # Identifies the call holding the half-open probe
+        self.lock = threading.Lock()
+        self.stats = {
+            'opened': 0,
+            'half_opened': 0,
+            'closed': 0,
+            'rejected': 0  # Calls skipped while open or while a probe was in flight
+        }
+    
+    def _transition(self, state, reason):
+        """Change state, count it and log it; caller holds the lock"""
+        previous, self.state = self.state, state
+        self.stats[{self.OPEN: 'opened', self.HALF_OPEN: 'half_opened', self.CLOSED: 'closed'}[state]] += 1
+        if state == self.OPEN:
+            self.opened_at = time.monotonic()
+        icon = {self.OPEN: '🔴', self.HALF_OPEN: '🟡', self.CLOSED: '🟢'}[state]
+        log_message(f"{icon} {self.name} circuit {previous} → {state}: {reason}")
+        if self.logger:
+            self.logger.log_summary('circuit_transition', {
+                'engine': self.name, 'from': previous, 'to': state,
+                'reason': reason, 'cooldown': self.cooldown
+            })
+    
+    def _probe_due(self):
+        return self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown
+    
+    def _should_open(self):
+        if self.consecutive_failures >= BREAKER_FAILURE_THRESHOLD:
+            return True
+        if len(self.outcomes) >= BREAKER_MIN_CALLS:
+            return sum(self.outcomes) / len(self.outcomes) < BREAKER_MIN_SUCCESS
+        return False
+    
+    def is_available(self):
+        """Whether a call could go through now, without claiming the half-open probe"""
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                return self._probe_due()
+            return not self.probe_in_flight
+    
+    def allow(self):
+        """Claim one call; after the cooldown exactly one probe is let through.
+        Returns a claim token for release() (CALL, or this probe's own token), False when rejected."""
+        with self.lock:
+            if self.state == self.CLOSED:
+                return self.CALL
+            if self._probe_due():
+                self._transition(self.HALF_OPEN, f"probing after {self.cooldown:.0f}s cooldown")
+            if self.state == self.HALF_OPEN and not self.probe_in_flight:
+                self.probe_in_flight = True
+                self.probe_token = object()
+                return self.probe_token
+            self.stats['rejected'] += 1
+            return False
+    
+    def release(self, claim):
+        """Give back a claim whose call never finished; frees the probe only for the call that holds it"""
+        with self.lock:
+            if claim is self.probe_token:
+                self.probe_in_flight = False
+                self.probe_token = None
+    
+    def retry_in(self):
+        """Seconds until this circuit can let a call through again"""
+        with self.lock:
+            if self.state == self.OPEN:
+                return max(0.0, self.opened_at + self.cooldown - time.monotonic())
+            if self.state == self.HALF_OPEN and self.probe_in_flight:
+                return BREAKER_PROBE_POLL
+            return 0.0
+    
+    def record_success(self):
+        with self.lock:
+            self.consecutive_failures = 0
+            self.outcomes.append(True)
+            if self.state == self.HALF_OPEN:
+                self.probe_in_flight = False
+                self.cooldown = BREAKER_COOLDOWN
+                self.outcomes.clear()  # Judge the recovered engine on fresh calls only
+                self._transition(self.CLOSED, "probe succeeded")
+    
+    def record_failure(self, error):
+        with self.lock:
+            self.consecutive_failures += 1
+            self.outcomes.append(False)
+            if self.state == self.HALF_OPEN:
+                self.probe_in_flight = False
+                self.cooldown = min(BREAKER_COOLDOWN_MAX, self.cooldown * 2)
+                self._transition(self.OPEN, f"probe failed ({error}), next probe in {self.cooldown:.0f}s")
+            elif self.state == self.CLOSED and self._should_open():
+                kind = "rate limits" if isinstance(error, RateLimitError) else "failures"
+                self._transition(self.OPEN, f"{kind} ({error}), probe in {self.cooldown:.0f}s")
+
+# ========== LINGVA ENDPOINT POOL ==========
+
+def load_lingva_endpoints():
+    """Lingva endpoints from LINGVA_ENDPOINTS_FILE when present (self-hosted instances), else LINGVA_ENDPOINTS"""
+    if LINGVA_ENDPOINTS_FILE.exists():
+        with open(LINGVA_ENDPOINTS_FILE, 'r', encoding='utf-8') as f:
+            endpoints = [line.split('#', 1)[0].strip().rstrip('/') for line in f]
+        endpoints = [endpoint for endpoint in endpoints if endpoint]
+        if endpoints:
+            return list(dict.fromkeys(endpoints))
+    return list(LINGVA_ENDPOINTS)
+
+class EndpointPool:
+    """Health-scored endpoints: concurrent probes, least-loaded pick, failover to the next best"""
+    def __init__(self, name, urls, probe):
+        self.name = name
+        self.probe = probe  # probe(url) raises when the endpoint cannot translate
+        self.endpoints = [{
+            'url': url,
+            'latency': None,     # EWMA seconds, None until measured
+            'error_rate': 0.0,   # EWMA of failed requests
+            'healthy': True,     # Unprobed endpoints are tried
+            'in_flight': 0,
+            'requests': 0,
+            'failures': 0,
+            'probes': 0,
+            'probe_failures': 0,
+            'probe_rate_limited': 0
+        } for url in urls]
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+    
+    def start(self):
+        """Probe every endpoint now, then every LINGVA_PROBE_INTERVAL seconds, in a background thread"""
+        if self.thread is None and self.endpoints:
+            self.thread = threading.Thread(target=self._probe_loop, name=f"{self.name}-probes", daemon=True)
+            self.thread.start()
+    
+    def close(self):
+        """Stop the background probes"""
+        self.stop_event.set()
+    
+    def _probe_loop(self):
+        while not self.stop_event.is_set():
+            self.probe_all()
+            self.stop_event.wait(LINGVA_PROBE_INTERVAL)
+    
+    def probe_all(self):
+        """Probe all endpoints at once, so a dead instance does not hold up the others"""
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(self.endpoints)) as executor:
+            list(executor.map(self._probe_one, self.endpoints))
+    
+    def _probe_one(self, endpoint):
+        start = time.monotonic()
+        try:
+            self.probe(endpoint['url'])
+        except EngineCoolingDown:
+            return  # Engine is cooling down - no probe was sent
+        except RateLimitError:
+            with self.lock:
+                endpoint['probes'] += 1
+                endpoint['probe_rate_limited'] += 1  # Answered, only throttled - health stays as it is
+            return
+        except Exception as e:
+            with self.lock:
+                endpoint['probes'] += 1
+                endpoint['probe_failures'] += 1
+                self._set_health(endpoint, False, f"probe failed: {e}")
+            return
+        
+        elapsed = time.monotonic() - start
+        with self.lock:
+            endpoint['probes'] += 1
+            self._update_latency(endpoint, elapsed)
+            if not endpoint['healthy']:
+                endpoint['error_rate'] = 0.0  # Recovered - judge it on new requests
+            self._set_health(endpoint, True, f"probe answered in {elapsed:.2f}s")
+    
+    def _set_health(self, endpoint, healthy, reason):
+        """Caller holds the lock"""
+        if endpoint['healthy'] != healthy:
+            endpoint['healthy'] = healthy
+            icon = "💚" if healthy else "💔"
+            log_message(f"{icon} {self.name} endpoint {endpoint['url']} {'healthy' if healthy else 'unhealthy'}: {reason}")
+    
+    def _update_latency(self, endpoint, seconds):
+        if endpoint['latency'] is None:
+            endpoint['latency'] = seconds
+        else:
+            endpoint['latency'] += LINGVA_EWMA_ALPHA * (seconds - endpoint['latency'])
+    
+    def _score(self, endpoint, default_latency):
+        """Expected wait: latency scaled by requests already in flight and by the error rate"""
+        latency = endpoint['latency'] if endpoint['latency'] is not None else default_latency
+        return latency * (endpoint['in_flight'] + 1) / max(0.05, 1 - endpoint['error_rate'])
+    
+    def acquire(self, exclude=()):
+        """Best healthy endpoint not in exclude, counted in flight until release().
+        None when none is left - unhealthy endpoints wait for a successful probe."""
+        with self.lock:
+            healthy = [e for e in self.endpoints if e['url'] not in exclude and e['healthy']]
+            if not healthy:
+                return None
+            
+            # Unmeasured endpoints count as fast as the fastest known one, so they get tried
+            known = [e['latency'] for e in self.endpoints if e['latency'] is not None]
+            default_latency = min(known) if known else 1.0
+            endpoint = min(healthy, key=lambda e: self._score(e, default_latency))
+            endpoint['in_flight'] += 1
+            endpoint['requests'] += 1
+            return endpoint
+    
+    def release(self, endpoint, seconds, ok, error=None, unreachable=False):
+        """Record the outcome of a request taken with acquire()"""
+        with self.lock:
+            endpoint['in_flight'] -= 1
+            if ok:
+                self._update_latency(endpoint, seconds)
+                endpoint['error_rate'] -= LINGVA_EWMA_ALPHA * endpoint['error_rate']
+                return
+            
+            endpoint['failures'] += 1
+            endpoint['error_rate'] += LINGVA_EWMA_ALPHA * (1 - endpoint['error_rate'])
+            if unreachable:
+                self._set_health(endpoint, False, f"unreachable ({error})")
+            elif endpoint['error_rate'] > LINGVA_MAX_ERROR_RATE:
+                self._set_health(endpoint, False, f"{endpoint['error_rate'] * 100:.0f}% errors ({error})")
+    
+    def healthy_count(self):
+        with self.lock:
+            return sum(1 for endpoint in self.endpoints if endpoint['healthy'])
+
+# ========== FREE TRANSLATION ENGINES ==========
+
+class AsyncEngineMixin:
+    """Async interface next to sync translate(), bounded by per-engine concurrency"""
+    
+    def concurrency(self):
+        """Max in-flight requests of this engine"""
+        return ENGINE_CONCURRENCY.get(self.name, 1)
+    
+    def _async_semaphore(self):
+        """Semaphore bound to the running event loop (one per asyncio.run)"""
+        loop = asyncio.get_running_loop()
+        if getattr(self, '_semaphore_loop', None) is not loop:
+            self._semaphore_loop = loop
+            self._semaphore = asyncio.Semaphore(self.concurrency())
+        return self._semaphore
+    
+    async def _in_thread(self, func, arg):
+        """func(arg) in a worker thread under the concurrency limit. A cancelled caller (hedge loser)
+        stops waiting, but the slot stays taken until the thread has really finished its request."""
+        semaphore = self._async_semaphore()
+        await semaphore.acquire()
+        task = asyncio.ensure_future(asyncio.to_thread(func, arg))
+        
+        def finished(task):
+            semaphore.release()
+            if not task.cancelled():
+                task.exception()  # Retrieved, so an abandoned loser's error is not reported as unhandled
+        task.add_done_callback(finished)
+        return await asyncio.shield(task)
+    
+    async def translate_async(self, text):
+        """Run sync translate() in a worker thread while other requests are in flight"""
+        return await self._in_thread(self.translate, text)
+    
+    async def translate_batch_async(self, texts):
+        """Run sync translate_batch() in a worker thread"""
+        return await self._in_thread(self.translate_batch, texts)
+
+class BatchEngineMixin(AsyncEngineMixin):
+    """Multi-segment batch translation (one request or trans process per packed batch)"""
+    batch_char_limit = 1000
+    fails_over = False  # True when _request already tries every endpoint once - no same-engine retries on top
+    
+    def _init_batch_stats(self):
+        self.batch_stats = {
+            'requests': 0,
+            'segments': 0,
+            'bisections': 0
+        }
+        self.retry_stats = {
+            'transient': 0,
+            'rate_limited': 0,
+            'backoff_time': 0.0,
+            'recovered': 0,   # Requests that succeeded after a retry
+            'deferred': 0     # Retry-After longer than RETRY_AFTER_MAX: failed over, engine paused
+        }
+        self.retry_lock = threading.Lock()  # retry_stats is updated from every calling thread
+    
+    def _retry_delay(self, error, attempt):
+        """Seconds to back off before retry number attempt + 1, or None to fail over now"""
+        retries, base = RETRY_POLICIES[error_class(error)]
+        if self.fails_over:
+            retries = 0  # The endpoint walk was the retry
+        retry_after = getattr(error, 'retry_after', None)
+        if retry_after is not None:
+            self.limiter.defer(retry_after)  # Also on the last attempt - other threads and workers hold off as well
+        if attempt >= retries:
+            return None
+        if retry_after is not None:
+            if retry_after > RETRY_AFTER_MAX:
+                with self.retry_lock:
+                    self.retry_stats['deferred'] += 1
+                log_message(f"⏳ {self.name} asked to wait {retry_after:.0f}s (Retry-After), failing over meanwhile")
+                return None
+            return retry_after + random.uniform(0, base)  # Jitter keeps waiting callers from returning together
+        return random.uniform(0, min(RETRY_BACKOFF_MAX, base * 2 ** attempt))
+    
+    def _limited_request(self, text):
+        """Rate-limited _request feeding outcome back into the AIMD limiter.
+        Transient and rate-limit errors are retried with jittered exponential backoff before failover."""
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            start = time.perf_counter()
+            try:
+                result = self._request(text)
+            except RateLimitError as e:
+                self.limiter.record_rate_limited()
+                error = e
+            except TranslationError as e:
+                error = e
+            else:
+                self.limiter.record_success()
+                if attempt:
+                    with self.retry_lock:
+                        self.retry_stats['recovered'] += 1
+                return result
+            finally:
+                TIMINGS.record(f'engine {self.name}', time.perf_counter() - start, text)
+            
+            delay = self._retry_delay(error, attempt)
+            if delay is None:
+                raise error
+            attempt += 1
+            with self.retry_lock:
+                self.retry_stats[error_class(error)] += 1
+                self.retry_stats['backoff_time'] += delay
+            time.sleep(delay)
+            TIMINGS.record('backoff', delay)
+    
+    def translate_batch(self, texts):
+        """Translate packed segments in one request, bisecting when response is misaligned.
+        Returns list aligned with texts; None marks segments this engine could not translate."""
+        if len(texts) == 1:
+            try:
+                return [self.translate(texts[0])]
+            except TranslationError:
+                return [None]
+        
+        joined = BATCH_DELIMITER.join(texts)
+        try:
+            raw = self._limited_request(joined)
+        except (RateLimitError, TranslationError) as e:
+            self.logger.log_translation(joined, "", self.name, False, e)
+            raise
+        
+        self.batch_stats['requests'] += 1
+        
+        parts = [part.strip() for part in raw.split(BATCH_DELIMITER)]
+        if len(parts) == len(texts) and all(parts):
+            self.batch_stats['segments'] += len(texts)
+            for text, translated in zip(texts, parts):
+                self.logger.log_translation(text, translated, self.name, True)
+            return parts
+        
+        # Misaligned response - split in half and retry down to single segments
+        self.batch_stats['bisections'] += 1
+        mid = len(texts) // 2
+        results = []
+        error = None
+        for half in (texts[:mid], texts[mid:]):
+            if error is not None:
+                results += [None] * len(half)  # Rate limited or cooling down - don't send the rest
+                continue
+            try:
+                results += self.translate_batch(half)
+            except (RateLimitError, EngineCoolingDown, TranslationError) as e:
+                # Keep what the other half translated; only the None entries fall through
+                results += [None] * len(half)
+                if not isinstance(e, TranslationError):
+                    error = e
+        if error is not None and not any(results):
+            raise error  # Nothing translated: the cascade records the rate limit as usual
+        return results
+
+def pack_segments(texts, char_limit, max_segments=BATCH_MAX_SEGMENTS):
+    """Greedily pack segments into batches under engine character limit"""
+    batches = []
+    current = []
+    current_chars = 0
+    delimiter_len = len(BATCH_DELIMITER)
+    
+    for text in texts:
+        needed = len(text) + (delimiter_len if current else 0)
+        if current and (current_chars + needed > char_limit or len(current) >= max_segments):
+            batches.append(current)
+            current = []
+            current_chars = 0
+            needed = len(text)
+        current.append(text)
+        current_chars += needed
+    
+    if current:
+        batches.append(current)
+    return batches
+
+class GoogleEngine(BatchEngineMixin):
+    """Google Translate (using googletrans library)"""
+    batch_char_limit = 4500
+    
+    def __init__(self, logger):
+        self.name = "Google"
+        self.logger = logger
+        self.limiter = RateLimiter(self.name, RATE_START_OTHER)
+        self.local = threading.local()  # One googletrans Translator (and its keep-alive client) per thread
+        self._init_batch_stats()
+    
+    def _request(self, text):
+        """Single googletrans call without logging or sleep"""
+        try:
+            translator = getattr(self.local, 'translator', None)
+            if translator is None:
+                from googletrans import Translator
+                translator = self.local.translator = Translator()
+            result = translator.translate(text, src='en', dest='id')
+            
+            if not result or not result.text:
+                raise TranslationError("Empty Google translation result")
+            
+            return result.text
+            
+        except ImportError:
+            raise TranslationError("googletrans library not installed. Run: pip install googletrans==4.0.0rc1")
+        except TranslationError:
+            raise
+        except Exception as e:
+            # googletrans wraps HTTP status in its messages; network errors come from httpx/httpcore
+            message = str(e).lower()
+            response = getattr(e, 'response', None)
+            if "rate limit" in message or "429" in message or "too many requests" in message:
+                headers = getattr(response, 'headers', None) or {}
+                raise RateLimitError(f"Google rate limit: {e}", parse_retry_after(headers.get('Retry-After')))
+            elif (isinstance(e, OSError) or type(e).__module__.split('.')[0] in ('httpx', 'httpcore')
+                  or re.search(r'\b5\d\d\b', message)):
+                raise TransientError(f"Google transient error: {e}")
+            else:
+                raise TranslationError(f"Google translate error: {e}")
+    
+    def translate(self, text):
+        """Translate using googletrans"""
+        try:
+            translated = self._limited_request(text)
+        except (RateLimitError, TranslationError) as e:
+            self.logger.log_translation(text, "", self.name, False, e)
+            raise
+        
+        # Log successful translation
+        self.logger.log_translation(text, translated, self.name, True)
+        
+        return translated
+
+class BingEngine(BatchEngineMixin):
+    """Bing Translator (web scraping)"""
+    batch_char_limit = 1000
+    
+    def __init__(self, logger):
+        self.name = "Bing"
+        self.logger = logger
+        self.limiter = RateLimiter(self.name, RATE_START_OTHER)
+        self.http = get_http_pool()
+        self._init_batch_stats()
+    
+    def _request(self, text):
+        """Single Bing web request without logging or sleep"""
+        try:
+            url = BING_URL
+            data = {
+                'text': text,
+                'fromLang': 'en',
+                'toLang': 'id',
+            }
+            
+            response = self.http.post(url, data=data, timeout=20)
+            
+            if response.status_code == 429:
+                raise RateLimitError("Bing rate limit exceeded", parse_retry_after(response.headers.get('Retry-After')))
+            elif response.status_code >= 500:
+                raise TransientError(f"Bing HTTP error: {response.status_code}")
+            elif response.status_code != 200:
+                raise TranslationError(f"Bing HTTP error: {response.status_code}")
+            
+            # Parse Bing response: [{"translations": [{"text": ...}]}] (older: {"translationResponse": ...})
+            result = response.json()
+            
+            if isinstance(result, list) and result and isinstance(result[0], dict) and result[0].get('translations'):
+                return result[0]['translations'][0]['text']
+            elif isinstance(result, dict) and 'translationResponse' in result:
+                return result['translationResponse']
+            else:
+                raise TranslationError("Bing response format changed")
+                
+        except self.http.errors as e:
+            raise TransientError(f"Bing network error: {e}")
+        except ValueError as e:
+            raise TransientError(f"Bing JSON parse error: {e}")
+    
+    def translate(self, text):
+        """Translate using Bing web interface"""
+        try:
+            translated = self._limited_request(text)
+        except (RateLimitError, TranslationError) as e:
+            self.logger.log_translation(text, "", self.name, False, e)
+            raise
+        
+        self.logger.log_translation(text, translated, self.name, True)
+        
+        return translated
+
+class LingvaEngine(BatchEngineMixin):
+    """Lingva Translate (Google Translate proxy)"""
+    batch_char_limit = 2000
+    fails_over = True
+    
+    def __init__(self, logger):
+        self.name = "Lingva"
+        self.logger = logger
+        self.http = get_http_pool()
+        # Multiple Lingva instances, health-probed in the background and used side by side
+        self.endpoints = load_lingva_endpoints()
+        self.pool = EndpointPool(self.name, self.endpoints, self._probe)
+        # Every instance has its own limit, so the shared bucket starts at one share per instance
+        self.limiter = RateLimiter(self.name, min(RATE_MAX, RATE_START_OTHER * max(1, len(self.endpoints))))
+        self._init_batch_stats()
+        self.pool.start()
+    
+    def concurrency(self):
+        return max(ENGINE_CONCURRENCY.get(self.name, 1), LINGVA_PER_ENDPOINT * len(self.endpoints))
+    
+    def _post(self, endpoint, text, timeout):
+        """One request to one instance; network errors are raised as they are"""
+        response = self.http.post(endpoint, json={'q': text}, timeout=timeout)
+        
+        if response.status_code == 429:
+            raise RateLimitError("Lingva rate limit exceeded", parse_retry_after(response.headers.get('Retry-After')))
+        elif response.status_code >= 500:
+            raise TransientError(f"Lingva HTTP {response.status_code}")
+        elif response.status_code != 200:
+            raise TranslationError(f"Lingva HTTP {response.status_code}")
+        
+        try:
+            result = response.json()
+        except ValueError as e:
+            raise TransientError(f"Lingva JSON parse error: {e}")
+        
+        if isinstance(result, dict) and 'translation' in result:
+            return result['translation']
+        raise TranslationError("Lingva response missing translation field")
+    
+    def _probe(self, url):
+        """Health probe of one instance, counted against the shared rate limit like any request"""
+        self.limiter.acquire()
+        try:
+            self._post(url, LINGVA_PROBE_TEXT, LINGVA_PROBE_TIMEOUT)
+        except RateLimitError:
+            self.limiter.record_rate_limited()
+            raise
+    
+    def _request(self, text):
+        """Lingva request on the best healthy endpoint, failing over to the others, without logging or sleep"""
+        tried = set()
+        error = TranslationError("No Lingva endpoints configured")
+        while True:
+            endpoint = self.pool.acquire(tried)
+            if endpoint is None:
+                if not tried and self.endpoints:
+                    raise TransientError(f"No healthy Lingva endpoint (0/{len(self.endpoints)})")  # Fail fast, the breaker counts it
+                raise error
+            tried.add(endpoint['url'])
+            
+            start = time.monotonic()
+            try:
+                translated = self._post(endpoint['url'], text, LINGVA_TIMEOUT)
+            except self.http.errors as e:
+                error = TransientError(f"Lingva network error: {e}")
+                self.pool.release(endpoint, time.monotonic() - start, False, e, unreachable=True)
+                continue
+            except (RateLimitError, TranslationError) as e:
+                error = e
+                self.pool.release(endpoint, time.monotonic() - start, False, e)
+                continue
+            
+            self.pool.release(endpoint, time.monotonic() - start, True)
+            return translated
+    
+    def translate(self, text):
+        """Translate using Lingva API"""
+        try:
+            translated = self._limited_request(text)
+        except (RateLimitError, TranslationError) as e:
+            self.logger.log_translation(text, "", self.name, False, e)
+            raise
+        
+        self.logger.log_translation(text, translated, self.name, True)
+        
+        return translated
+
+class ShellEngine(BatchEngineMixin):
+    """translate-shell (offline backup), fed segments line by line over stdin"""
+    batch_char_limit = 3000
+    
+    def __init__(self, logger):
+        self.name = "Shell"
+        self.logger = logger
+        self.limiter = RateLimiter(self.name, RATE_START_SHELL)
+        self._init_batch_stats()
+    
+    def _request(self, text):
+        """One trans process for all lines of text (one output line per input line)"""
+        line_count = text.count(BATCH_DELIMITER) + 1
+        try:
+            result = subprocess.run(
+                SHELL_COMMAND,
+                input=text + '\n',
+                capture_output=True,
+                text=True,
+                timeout=SHELL_TIMEOUT + SHELL_TIMEOUT_PER_LINE * line_count,
+                encoding='utf-8'
+            )
+        except subprocess.TimeoutExpired:
+            raise TransientError("translate-shell timeout")
+        except OSError as e:
+            raise TranslationError(f"translate-shell error: {e}")
+        
+        if result.returncode != 0:
+            raise TransientError(f"translate-shell failed: {result.stderr}")  # trans fails on network errors
+        
+        translated = result.stdout.strip()
+        if not translated:
+            raise TranslationError("Empty translation result")
+        
+        return translated
+    
+    def translate(self, text):
+        """Translate using translate-shell"""
+        try:
+            translated = self._limited_request(text)
+        except (RateLimitError, TranslationError) as e:
+            self.logger.log_translation(text, "", self.name, False, e)
+            raise
+        
+        self.logger.log_translation(text, translated, self.name, True)
+        
+        return translated
+
+# ========== SMART MULTI-ENGINE PROCESSOR ==========
+
+class SmartMultiEngineTranslator:
+    """Smart cascade translation with per-engine circuit breakers and enhanced logging"""
+    
+    def __init__(self, logger, memory=None):
+        self.logger = logger
+        self.memory = memory
+        
+        # Engine cascade configuration
+        self.engines = [
+            GoogleEngine(logger),
+            BingEngine(logger),
+            LingvaEngine(logger),
+            ShellEngine(logger)
+        ]
+        
+        # Smart blocking system: one circuit breaker per engine
+        self.breakers = {}
+        self.failure_counts = defaultdict(int)
+        self.success_counts = defaultdict(int)
+        self.all_open_since = None  # Set while every circuit is open or cooling down
+        self.given_up = False       # Set once that stall outlasted BREAKER_GIVE_UP
+        self.engine_waits = {'waits': 0, 'wait_time': 0.0, 'stalled': 0.0,  # stalled: wall-clock seconds
+                             'given_up': 0}  # Segments left untranslated after giving up
+        
+        # Dynamic engine order: EWMA seconds per segment and success rate per engine
+        self.engine_health = {}
+        self.order = []  # Engine names in the current cascade order
+        self.order_checked = 0.0  # When the order was last re-evaluated (monotonic)
+        self.order_history = deque(maxlen=ORDER_HISTORY)  # Changes of the leading engine
+        self.reorders = 0
+        self.in_flight = defaultdict(int)  # Async calls currently queued or running per engine
+        
+        # Load balancing mode: weighted round-robin credit and segments assigned per engine
+        self.balance_credit = defaultdict(float)
+        self.balance_assigned = defaultdict(int)
+        
+        # Hedged requests: recent latencies, hedges fired per primary, race wins per engine
+        self.latencies = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+        self.primary_calls = defaultdict(int)
+        self.hedges = defaultdict(int)
+        self.hedge_wins = defaultdict(int)
+        
+        # NEW: Batch processing tracking (what the old global BATCH_DELAY would have stalled)
+        self.files_processed = 0
+        self.legacy_stall = 0
+        
+        # Statistics
+        self.stats = {
+            'google': 0,
+            'bing': 0,
+            'lingva': 0,
+            'shell': 0,
+            'failed': 0,
+            'blocked_saves': 0,
+            'dedup_saves': 0
+        }
+    
+    def _breaker(self, engine_name):
+        breaker = self.breakers.get(engine_name)
+        if breaker is None:
+            breaker = self.breakers[engine_name] = CircuitBreaker(engine_name, self.logger)
+        return breaker
+    
+    def _cooling_remaining(self, engine):
+        limiter = getattr(engine, 'limiter', None)
+        return limiter.cooling_remaining() if limiter else 0.0
+    
+    def _available(self, engine):
+        """Whether engine could take a call now: not cooling down and its circuit lets calls through"""
+        return not self._cooling_remaining(engine) and self._breaker(engine.name).is_available()
+    
+    def _claim(self, engine):
+        """Claim one call on engine; returns the breaker's claim token, False while it cools down or is open"""
+        return not self._cooling_remaining(engine) and self._breaker(engine.name).allow()
+    
+    def _health(self, engine_name):
+        health = self.engine_health.get(engine_name)
+        if health is None:
+            health = self.engine_health[engine_name] = {'latency': ORDER_PRIOR_LATENCY, 'success': 1.0, 'calls': 0}
+        return health
+    
+    def _observe(self, engine, seconds, ok, segments=1):
+        """Fold one engine call into its EWMA latency (per segment) and success rate"""
+        health = self._health(engine.name)
+        health['latency'] += ORDER_EWMA_ALPHA * (seconds / max(1, segments) - health['latency'])
+        health['success'] += ORDER_EWMA_ALPHA * ((1.0 if ok else 0.0) - health['success'])
+        health['calls'] += 1
+    
+    def _segments_per_request(self, engine):
+        """Average segments one request of engine carries (1 until it has sent batches)"""
+        stats = getattr(engine, 'batch_stats', None)
+        if stats and stats['requests']:
+            return max(1.0, stats['segments'] / stats['requests'])
+        return 1.0
+    
+    def _engine_score(self, engine):
+        """Expected seconds to get one segment translated: latency / success rate,
+        plus rate-limit wait spread over the segments of a request and the queue of async calls in flight.
+        Engines with fewer than ORDER_MIN_CALLS calls score the prior, so they keep their configured place."""
+        health = self._health(engine.name)
+        if health['calls'] < ORDER_MIN_CALLS:
+            return ORDER_PRIOR_LATENCY
+        limiter = getattr(engine, 'limiter', None)
+        wait = limiter.expected_wait() / self._segments_per_request(engine) if limiter else 0.0
+        queue = health['latency'] * self.in_flight[engine.name] / engine.concurrency()
+        return health['latency'] / max(ORDER_MIN_SUCCESS, health['success']) + wait + queue
+    
+    def _ordered_engines(self):
+        """Engines in cascade order; with DYNAMIC_ORDER the cheapest engine goes first"""
+        if not DYNAMIC_ORDER:
+            return list(self.engines)
+        
+        by_name = {engine.name: engine for engine in self.engines}
+        now = time.monotonic()
+        if self.order and now - self.order_checked < ORDER_DWELL:
+            return [by_name[name] for name in self.order if name in by_name]  # Keep the order for a while, not per request
+        self.order_checked = now
+        order = [name for name in self.order if name in by_name]
+        order += [engine.name for engine in self.engines if engine.name not in order]
+        scores = {name: self._engine_score(by_name[name]) for name in order}
+        
+        # Bubble engines forward only past clearly more expensive ones, so close scores do not flap
+        swapped = True
+        while swapped:
+            swapped = False
+            for i in range(1, len(order)):
+                if scores[order[i]] < scores[order[i - 1]] * (1 - ORDER_HYSTERESIS):
+                    order[i - 1], order[i] = order[i], order[i - 1]
+                    swapped = True
+        
+        if self.order and order != self.order:
+            self.reorders += 1
+            if order[0] != self.order[0]:
+                decision = ' → '.join(f"{name} {scores[name]:.2f}s" for name in order)
+                self.order_history.append((datetime.now().strftime('%H:%M:%S'), decision))
+                log_message(f"🔀 Engine order: {decision}")
+        self.order = order
+        return [by_name[name] for name in order]
+    
+    def _get_active_engines(self):
+        """Get list of engines whose circuit lets calls through, in cascade order"""
+        return [e for e in self._ordered_engines() if self._available(e)]
+    
+    def _record_success(self, engine):
+        """Update success bookkeeping after an engine call"""
+        self.success_counts[engine.name] += 1
+        self._breaker(engine.name).record_success()
+    
+    def _record_failure(self, engine, error, claim=None):
+        """Update failure bookkeeping; the engine's circuit opens when needed"""
+        if isinstance(error, EngineCoolingDown):
+            self._breaker(engine.name).release(claim)  # Planned pause, not a failure - the claim is given back
+            return
+        self.failure_counts[engine.name] += 1
+        
+        if isinstance(error, RateLimitError):
+            log_message(f"⚠️ {engine.name} rate limited")
+        elif not isinstance(error, TranslationError):
+            log_message(f"❌ {engine.name} unexpected error: {error}")
+        self._breaker(engine.name).record_failure(error)
+    
+    def _cascade_engines(self):
+        """Active engines for a new segment; empty while every engine is open or cooling down"""
+        active_engines = self._get_active_engines()
+        
+        if not active_engines:
+            if self.all_open_since is None:
+                self.all_open_since = time.monotonic()
+                log_message(f"⏸️ No engine available (circuits open / cooling down), waiting {self._probe_wait():.1f}s")
+            return active_engines
+        if self.all_open_since is not None:
+            stalled = time.monotonic() - self.all_open_since
+            self.engine_waits['stalled'] += stalled
+            log_message(f"▶️ Engine available again after {stalled:.1f}s")
+            self.all_open_since = None
+            self.given_up = False
+        
+        # Count blocked engine saves
+        blocked_count = len(self.engines) - len(active_engines)
+        if blocked_count > 0:
+            self.stats['blocked_saves'] += blocked_count
+        
+        return active_engines
+    
+    def _probe_wait(self):
+        """Seconds until the first engine is out of its cooldown and its circuit lets a call through"""
+        return min(max(self._breaker(e.name).retry_in(), self._cooling_remaining(e)) for e in self.engines)
+    
+    def _count_probe_wait(self):
+        give_up_in = max(0.0, self.all_open_since + BREAKER_GIVE_UP - time.monotonic())
+        wait = min(self._probe_wait(), give_up_in)
+        self.engine_waits['waits'] += 1
+        self.engine_waits['wait_time'] += wait
+        return wait
+    
+    def _give_up(self):
+        """Whether every engine has been unavailable for BREAKER_GIVE_UP seconds; logs the circuits once"""
+        if time.monotonic() - self.all_open_since < BREAKER_GIVE_UP:
+            return False
+        if not self.given_up:
+            self.given_up = True
+            log_message(f"🛑 No engine available for {BREAKER_GIVE_UP:.0f}s, leaving segments untranslated until one recovers:")
+            for engine in self.engines:
+                breaker = self._breaker(engine.name)
+                log_message(f"   {engine.name}: circuit {breaker.state} (cooldown {breaker.cooldown:.0f}s, "
+                            f"retry in {breaker.retry_in():.0f}s), limiter cooling {self._cooling_remaining(engine):.0f}s")
+            if self.logger:
+                self.logger.log_summary('engines_given_up', {
+                    e.name: {'state': self._breaker(e.name).state, 'retry_in': self._breaker(e.name).retry_in()}
+                    for e in self.engines
+                })
+        return True
+    
+    def _wait_for_engines(self):
+        """Cascade engines, sleeping until one is available instead of resetting every circuit.
+        Empty once every engine stayed unavailable for BREAKER_GIVE_UP seconds."""
+        engines = self._cascade_engines()
+        while not engines and not self._give_up():
+            start = time.perf_counter()
+            time.sleep(self._count_probe_wait())
+            TIMINGS.record('stall', time.perf_counter() - start)
+            engines = self._cascade_engines()
+        return engines
+    
+    async def _wait_for_engines_async(self):
+        engines = self._cascade_engines()
+        while not engines and not self._give_up():
+            start = time.perf_counter()
+            await asyncio.sleep(self._count_probe_wait())
+            TIMINGS.record('stall', time.perf_counter() - start)
+            engines = self._cascade_engines()
+        return engines
+    
+    def _accept_translation(self, engine, text, translated):
+        """Count successful single translation and store it in memory"""
+        self._record_success(engine)
+        
+        engine_key = engine.name.lower()
+        self.stats[engine_key] += 1
+        
+        # Enhanced logging with engine info
+        if self.stats[engine_key] == 1 or self.stats[engine_key] % 50 == 0:
+            log_message(f"✅ {engine.name} working ({self.stats[engine_key]} translations) [rate: {engine.limiter.rate:.2f} req/s]")
+        
+        if self.memory and translated and translated != text:
+            self.memory.put(text, translated, engine.name)
+    
+    def _lookup_memory(self, text):
+        """Translation memory lookup before walking the cascade"""
+        if self.memory:
+            return self.memory.get(text)
+        return None
+    
+    def translate_single(self, text):
+        """Translate single text with smart blocking cascade"""
+        if not text or not text.strip():
+            return text
+        
+        cached = self._lookup_memory(text)
+        if cached is not None:
+            return cached
+        
+        tried = False
+        while not tried:  # Every engine turned away the call (open circuit or cooldown) - wait for one
+            engines = self._wait_for_engines()
+            if not engines:
+                self.engine_waits['given_up'] += 1
+                return text
+            for engine in self._balanced(engines):
+                claim = self._claim(engine)
+                if not claim:
+                    continue
+                start = time.monotonic()
+                try:
+                    translated = engine.translate(text)
+                except EngineCoolingDown as e:
+                    self._record_failure(engine, e, claim)  # Cooldown began on another thread - next engine
+                    continue
+                except Exception as e:
+                    tried = True
+                    self._observe(engine, time.monotonic() - start, False)
+                    self._record_failure(engine, e)
+                    continue
+                
+                self._observe(engine, time.monotonic() - start, True)
+                self._accept_translation(engine, text, translated)
+                return translated
+        
+        # All active engines failed
+        log_message("❌ All active engines failed for this text!")
+        self.stats['failed'] += 1
+        return text
+    
+    def _hedge_delay(self, engine_name):
+        """Latency threshold after which a backup request is sent"""
+        samples = self.latencies[engine_name]
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY
+        percentile = statistics.quantiles(samples, n=100)[HEDGE_PERCENTILE - 1]
+        return max(HEDGE_MIN_DELAY, percentile)
+    
+    def _next_engine(self, engines, engine):
+        """Next available engine after engine in cascade order"""
+        for candidate in engines[engines.index(engine) + 1:]:
+            if self._available(candidate):
+                return candidate
+        return None
+    
+    async def _timed_call(self, engine, call, segments, claim):
+        """Run call(engine), recording latency for hedging and engine ordering"""
+        start = time.monotonic()
+        try:
+            result = await call(engine)
+        except asyncio.CancelledError:
+            self._breaker(engine.name).release(claim)  # A cancelled hedge loser must not hold its probe
+            raise
+        except EngineCoolingDown:
+            raise
+        except Exception:
+            self._observe(engine, time.monotonic() - start, False, segments)
+            raise
+        elapsed = time.monotonic() - start
+        self.latencies[engine.name].append(elapsed)
+        self._observe(engine, elapsed, True, segments)
+        return result
+    
+    def _start_call(self, engine, call, segments, claim):
+        """Task for one engine call, counted in flight from creation so the next segment sees the queue"""
+        self.in_flight[engine.name] += 1
+        task = asyncio.create_task(self._timed_call(engine, call, segments, claim))
+        task.add_done_callback(lambda _: self.in_flight.__setitem__(engine.name, self.in_flight[engine.name] - 1))
+        return task
+    
+    async def _hedged_call(self, primary, claim, backup, call, is_valid, segments=1):
+        """Call primary (already claimed); if slower than its p95, race backup too. First valid answer wins.
+        Returns (winner_engine or None, result, engines_tried). Failures are recorded here;
+        an engine that turned out to be cooling down does not count as tried."""
+        self.primary_calls[primary.name] += 1
+        claims = {primary.name: claim}
+        tasks = {self._start_call(primary, call, segments, claim): primary}
+        
+        delay = self._hedge_delay(primary.name) if backup else None
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done:
+            claims[backup.name] = self._claim(backup)
+            if claims[backup.name]:
+                self.hedges[primary.name] += 1
+                tasks[self._start_call(backup, call, segments, claims[backup.name])] = backup
+        
+        hedged = len(tasks) > 1
+        pending = set(tasks)
+        declined = set()
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                engine = tasks[task]
+                try:
+                    result = task.result()
+                except Exception as e:
+                    if isinstance(e, EngineCoolingDown):
+                        declined.add(engine)
+                    self._record_failure(engine, e, claims[engine.name])
+                    continue
+                if not is_valid(result):
+                    # Empty answer counts as a failure, which also frees a half-open probe
+                    self._record_failure(engine, TranslationError(f"{engine.name} returned no translation"))
+                    continue
+                
+                # Winner found - cancel the loser (its worker thread finishes in background)
+                for loser in pending:
+                    loser.cancel()
+                if hedged:
+                    self.hedge_wins[engine.name] += 1
+                return engine, result, [e for e in tasks.values() if e not in declined]
+        
+        return None, None, [e for e in tasks.values() if e not in declined]
+    
+    async def translate_single_async(self, text):
+        """Async cascade: same blocking rules, engine calls run concurrently per engine limit"""
+        if not text or not text.strip():
+            return text
+        
+        cached = self._lookup_memory(text)
+        if cached is not None:
+            return cached
+        
+        tried = set()
+        while not tried:  # Every engine turned away the call (open circuit or cooldown) - wait for one
+            engines = self._balanced(await self._wait_for_engines_async())
+            if not engines:
+                self.engine_waits['given_up'] += 1
+                return text
+            for engine in engines:
+                claim = engine.name not in tried and self._claim(engine)
+                if not claim:
+                    continue  # Already raced, or opened by another in-flight segment
+                
+                backup = self._next_engine(engines, engine) if HEDGE_REQUESTS else None
+                winner, translated, attempted = await self._hedged_call(
+                    engine, claim, backup,
+                    lambda e: e.translate_async(text),
+                    lambda result: bool(result)
+                )
+                tried.update(e.name for e in attempted)
+                
+                if winner:
+                    self._accept_translation(winner, text, translated)
+                    return translated
+        
+        log_message("❌ All active engines failed for this text!")
+        self.stats['failed'] += 1
+        return text
+    
+    def _split_pending(self, texts):
+        """Fill results from memory, return (results, indices still needing translation)"""
+        results = list(texts)
+        pending = []
+        
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                continue
+            cached = self._lookup_memory(text)
+            if cached is not None:
+                results[i] = cached
+                continue
+            pending.append(i)
+        
+        return results, pending
+    
+    def _index_batches(self, engine, texts, pending):
+        """Pack pending segment indices under engine character limit"""
+        index_batches = []
+        offset = 0
+        for batch in pack_segments([texts[i] for i in pending], engine.batch_char_limit):
+            index_batches.append(pending[offset:offset + len(batch)])
+            offset += len(batch)
+        return index_batches
+    
+    def _apply_batch(self, engine, texts, batch_indices, translated_batch, results):
+        """Store batch results; return indices the engine could not translate"""
+        if not any(translated_batch):
+            self._record_failure(engine, TranslationError(f"{engine.name} batch returned no translations"))
+            return list(batch_indices)
+        self._record_success(engine)
+        engine_key = engine.name.lower()
+        missing = []
+        
+        for i, translated in zip(batch_indices, translated_batch):
+            if not translated:
+                missing.append(i)
+                continue
+            results[i] = translated
+            self.stats[engine_key] += 1
+            if self.memory and translated != texts[i]:
+                self.memory.put(texts[i], translated, engine.name)
+        if self.memory:
+            self.memory.flush()  # Each packed batch is on disk before the next request - a killed run resumes from it
+        
+        log_message(f"✅ {engine.name} batch: {len(batch_indices)} segments in 1 request "
+                    f"({self.stats[engine_key]} translations)")
+        return missing
+    
+    def _call_batch(self, engine, texts, batch_indices):
+        """One engine.translate_batch call without bookkeeping (safe in worker threads).
+        Returns (translated_batch or None, error or None, elapsed seconds)."""
+        start = time.monotonic()
+        try:
+            return engine.translate_batch([texts[i] for i in batch_indices]), None, time.monotonic() - start
+        except Exception as e:
+            return None, e, time.monotonic() - start
+    
+    def _settle_batch(self, engine, texts, batch_indices, translated_batch, error, elapsed, results, claim=None):
+        """Bookkeeping for a _call_batch outcome; returns indices still untranslated.
+        elapsed None means the batch was never sent."""
+        if elapsed is None:
+            return batch_indices
+        if not isinstance(error, EngineCoolingDown):
+            self._observe(engine, elapsed, error is None and any(translated_batch), len(batch_indices))
+        if error is not None:
+            self._record_failure(engine, error, claim)
+            return batch_indices
+        return self._apply_batch(engine, texts, batch_indices, translated_batch, results)
+    
+    def _balance_weight(self, engine, batched=False):
+        """Sustainable segments/sec: AIMD rate × success EWMA (× segments per packed request)"""
+        limiter = getattr(engine, 'limiter', None)
+        weight = (limiter.rate if limiter else 1.0) * max(ORDER_MIN_SUCCESS, self._health(engine.name)['success'])
+        batch = getattr(engine, 'batch_stats', None)
+        if batched and batch and batch['requests']:
+            weight *= batch['segments'] / batch['requests']
+        return weight
+    
+    def _balance_pick(self, engines, weights):
+        """Smooth weighted round robin: engines are picked in proportion to their weights, interleaved"""
+        for engine in engines:
+            self.balance_credit[engine.name] += weights[engine.name]
+        picked = max(engines, key=lambda e: self.balance_credit[e.name])
+        self.balance_credit[picked.name] -= sum(weights[e.name] for e in engines)
+        self.balance_assigned[picked.name] += 1
+        return picked
+    
+    def _balanced(self, engines):
+        """Cascade for one segment: a weighted pick first, the usual order behind it for failover"""
+        if not BALANCE_ENGINES or len(engines) < 2:
+            return engines
+        first = self._balance_pick(engines, {e.name: self._balance_weight(e) for e in engines})
+        return [first] + [e for e in engines if e is not first]
+    
+    def _balance_shares(self, engines, pending):
+        """Split pending indices over engines in proportion to their sustainable rate"""
+        weights = {e.name: self._balance_weight(e, batched=True) for e in engines}
+        shares = {e.name: [] for e in engines}
+        for i in pending:
+            shares[self._balance_pick(engines, weights).name].append(i)
+        return [(e, shares[e.name]) for e in engines if shares[e.name]]
+    
+    def _balanced_round(self, texts, engines, pending, results):
+        """All engines translate their share at once (one thread each); bookkeeping stays on this thread.
+        Returns (indices still pending, names of engines that left segments untranslated)."""
+        def run(engine, indices):
+            outcomes = []
+            failed = False
+            for batch_indices in self._index_batches(engine, texts, indices):
+                claim = not failed and self._claim(engine)
+                if not claim:
+                    outcomes.append((batch_indices, None, None, None, None))  # Left for the next round
+                    continue
+                translated_batch, error, elapsed = self._call_batch(engine, texts, batch_indices)
+                outcomes.append((batch_indices, translated_batch, error, elapsed, claim))
+                failed = error is not None
+            return outcomes
+        
+        still_pending = []
+        incomplete = set()
+        shares = self._balance_shares(engines, pending)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(shares)) as executor:
+            futures = [(engine, executor.submit(run, engine, indices)) for engine, indices in shares]
+            for engine, future in futures:
+                for batch_indices, translated_batch, error, elapsed, claim in future.result():
+                    missing = self._settle_batch(engine, texts, batch_indices, translated_batch, error, elapsed,
+                                                 results, claim)
+                    if missing:
+                        incomplete.add(engine.name)
+                        still_pending.extend(missing)
+        return sorted(still_pending), incomplete
+    
+    def translate_batch(self, texts):
+        """Translate many segments with packed requests, falling back per segment"""
+        results, pending = self._split_pending(texts)
+        
+        if BALANCE_ENGINES:
+            # Rounds over all healthy engines; an engine that left segments untranslated sits out the next round
+            excluded = set()
+            while pending:
+                engines = [e for e in self._get_active_engines()
+                           if isinstance(e, BatchEngineMixin) and e.name not in excluded]
+                if not engines:
+                    break
+                pending, incomplete = self._balanced_round(texts, engines, pending, results)
+                excluded |= incomplete
+        else:
+            for engine in self._get_active_engines():
+                if not pending:
+                    break
+                if not isinstance(engine, BatchEngineMixin):
+                    continue
+                
+                still_pending = []
+                for batch_indices in self._index_batches(engine, texts, pending):
+                    claim = self._claim(engine)
+                    if not claim:
+                        still_pending.extend(batch_indices)
+                        continue
+                    
+                    translated_batch, error, elapsed = self._call_batch(engine, texts, batch_indices)
+                    still_pending.extend(self._settle_batch(engine, texts, batch_indices,
+                                                            translated_batch, error, elapsed, results, claim))
+                
+                pending = sorted(still_pending)
+        
+        # Leftovers walk the full per-segment cascade
+        for i in pending:
+            results[i] = self.translate_single(texts[i])
+        
+        return results
+    
+    async def _run_batch_async(self, engine, texts, batch_indices, engines, results):
+        """One packed batch on engine (hedged to the next engine when enabled); returns missing indices"""
+        claim = self._claim(engine)
+        if not claim:
+            return batch_indices
+        batch_texts = [texts[i] for i in batch_indices]
+        
+        async def call(candidate):
+            # Re-pack for the candidate's own character limit (hedge engine may differ)
+            chunks = pack_segments(batch_texts, candidate.batch_char_limit)
+            parts = await asyncio.gather(*(candidate.translate_batch_async(chunk) for chunk in chunks))
+            return [translated for part in parts for translated in part]
+        
+        backup = self._next_engine(engines, engine) if HEDGE_REQUESTS else None
+        winner, translated_batch, _ = await self._hedged_call(
+            engine, claim, backup, call,
+            lambda result: any(result),
+            len(batch_indices)
+        )
+        if not winner:
+            return batch_indices
+        return self._apply_batch(winner, texts, batch_indices, translated_batch, results)
+    
+    async def translate_batch_async(self, texts):
+        """Async translate_batch: packed requests of each engine are in flight concurrently"""
+        results, pending = self._split_pending(texts)
+        
+        if BALANCE_ENGINES:
+            # Every healthy engine works on its weighted share at the same time
+            excluded = set()
+            while pending:
+                engines = [e for e in self._get_active_engines()
+                           if isinstance(e, BatchEngineMixin) and e.name not in excluded]
+                if not engines:
+                    break
+                jobs = [(engine, batch_indices)
+                        for engine, indices in self._balance_shares(engines, pending)
+                        for batch_indices in self._index_batches(engine, texts, indices)]
+                missing = await asyncio.gather(*(self._run_batch_async(engine, texts, batch_indices, engines, results)
+                                                 for engine, batch_indices in jobs))
+                excluded |= {engine.name for (engine, _), batch_missing in zip(jobs, missing) if batch_missing}
+                pending = sorted(i for batch_missing in missing for i in batch_missing)
+        else:
+            for engine in self._get_active_engines():
+                if not pending:
+                    break
+                if not isinstance(engine, BatchEngineMixin):
+                    continue
+                
+                engines = [e for e in self._ordered_engines() if isinstance(e, BatchEngineMixin)]
+                missing = await asyncio.gather(*(self._run_batch_async(engine, texts, batch_indices, engines, results)
+                                                 for batch_indices in self._index_batches(engine, texts, pending)))
+                pending = sorted(i for batch_missing in missing for i in batch_missing)
+        
+        # Leftovers walk the full per-segment cascade concurrently
+        leftovers = await asyncio.gather(*(self.translate_single_async(texts[i]) for i in pending))
+        for i, translated in zip(pending, leftovers):
+            results[i] = translated
+        
+        return results
+    
+    def close(self):
+        """Stop background work of the engines (endpoint health probes)"""
+        for engine in self.engines:
+            pool = getattr(engine, 'pool', None)
+            if pool is not None:
+                pool.close()
+    
+    def handle_file_completed(self):
+        """Count a finished file. Google/Bing cool down per engine by request volume (ENGINE_COOLDOWNS)
+        instead of stalling the whole process; the old stall is only tallied for the savings report."""
+        self.files_processed += 1
+        
+        if self.files_processed % BATCH_SIZE == 0:
+            if any(self._breaker(e.name).is_available() for e in self.engines if e.name in ['Google', 'Bing']):
+                self.legacy_stall += BATCH_DELAY
+    
+    def print_stats(self):
+        """Print comprehensive statistics"""
+        total_attempts = sum(v for k, v in self.stats.items() if k not in ['blocked_saves', 'dedup_saves'])
+        memory_hits = self.memory.hit_count() if self.memory else 0
+        
+        if total_attempts == 0 and memory_hits == 0:
+            return
+        
+        log_message("📊 Smart Engine Statistics:")
+        log_message(f"⏰ Rate Configuration: start Shell={RATE_START_SHELL}/s, Others={RATE_START_OTHER}/s (AIMD {RATE_MIN}-{RATE_MAX}/s)")
+        cooldowns = ', '.join(f"{name} {seconds}s/{requests} requests" for name, (requests, seconds) in ENGINE_COOLDOWNS.items())
+        log_message(f"🧊 Cooldown Configuration: {cooldowns or 'off'} (per engine)")
+        log_message(f"🎯 Pattern: {PATTERN}")
+        if ASYNC_ENGINES:
+            concurrency = ', '.join(f"{engine.name}={engine.concurrency()}" for engine in self.engines)
+            log_message(f"⚡ Async engines: {concurrency} in-flight requests")
+        
+        # Per-engine cooldowns against the old global batch delay
+        cooled = [(e.name, e.limiter.stats) for e in self.engines
+                  if getattr(e, 'limiter', None) and e.limiter.stats['cooldowns']]
+        if cooled:
+            summary = ', '.join(f"{name} {stats['cooldowns']}x ({stats['cooldown_time']:.0f}s)" for name, stats in cooled)
+            log_message(f"🧊 Per-engine cooldowns: {summary}")
+        if cooled or self.legacy_stall:
+            stalled = self.engine_waits['stalled']
+            log_message(f"🧊 Whole-process stalls: {stalled:.0f}s vs ~{self.legacy_stall}s with a global "
+                        f"{BATCH_DELAY}s delay every {BATCH_SIZE} files → ~{max(0, self.legacy_stall - stalled):.0f}s saved")
+        
+        # Corpus deduplication
+        if self.stats['dedup_saves'] > 0:
+            log_message(f"🧮 Corpus deduplication saved {self.stats['dedup_saves']} engine calls")
+        
+        # Translation memory
+        if self.memory:
+            mem = self.memory.stats
+            lookups = memory_hits + mem['misses']
+            hit_rate = (memory_hits / lookups) * 100 if lookups else 0
+            log_message(f"🧠 Translation memory: {memory_hits}/{lookups} hits ({hit_rate:.1f}%) "
+                        f"[LRU: {mem['lru_hits']}, disk: {mem['disk_hits']}, misses: {mem['misses']}, stored: {mem['stored']}]")
+        
+        # Adaptive rate limiters
+        for engine in self.engines:
+            limiter = engine.limiter
+            if limiter.stats['waits'] or limiter.stats['increases'] or limiter.stats['decreases']:
+                log_message(f"🚦 {engine.name} rate: {limiter.rate:.2f} req/s | waited {limiter.stats['wait_time']:.1f}s "
+                            f"in {limiter.stats['waits']} waits | +{limiter.stats['increases']} / -{limiter.stats['decreases']} adjustments")
+        
+        # Retries before failover
+        for engine in self.engines:
+            retry = getattr(engine, 'retry_stats', None)
+            if retry and (retry['transient'] or retry['rate_limited'] or retry['deferred']):
+                log_message(f"↩️ {engine.name} retries: {retry['transient']} transient, {retry['rate_limited']} rate-limited "
+                            f"| backoff {retry['backoff_time']:.1f}s | {retry['recovered']} recovered, "
+                            f"{retry['deferred']} long Retry-After failovers")
+        
+        # Shared HTTP connection pool
+        if _HTTP_POOL is not None:
+            protocol = "HTTP/2" if _HTTP_POOL.http2 else "HTTP/1.1 keep-alive"
+            for host, conn in _HTTP_POOL.connection_stats().items():
+                if conn['connections'] is None:
+                    log_message(f"🔌 {host} ({protocol}): {conn['requests']} requests")
+                else:
+                    log_message(f"🔌 {host} ({protocol}): {conn['requests']} requests over {conn['connections']} connections "
+                                f"({conn['reused']} reused)")
+        
+        # Lingva endpoint pool
+        for engine in self.engines:
+            pool = getattr(engine, 'pool', None)
+            if pool is None:
+                continue
+            log_message(f"🩺 {engine.name} endpoints: {pool.healthy_count()}/{len(pool.endpoints)} healthy")
+            for endpoint in pool.endpoints:
+                latency = f"{endpoint['latency'] * 1000:.0f}ms" if endpoint['latency'] is not None else "unmeasured"
+                log_message(f"  {'💚' if endpoint['healthy'] else '💔'} {endpoint['url']}: {latency} EWMA, "
+                            f"{endpoint['error_rate'] * 100:.0f}% errors | {endpoint['requests']} requests "
+                            f"({endpoint['failures']} failed) | {endpoint['probes']} probes ({endpoint['probe_failures']} failed, "
+                            f"{endpoint['probe_rate_limited']} rate limited)")
+        
+        # Multi-segment batch requests
+        for engine in self.engines:
+            if isinstance(engine, BatchEngineMixin) and engine.batch_stats['requests'] > 0:
+                batch = engine.batch_stats
+                per_request = batch['segments'] / batch['requests']
+                log_message(f"📨 {engine.name} batches: {batch['requests']} requests for {batch['segments']} segments "
+                            f"({per_request:.1f}/request, {batch['bisections']} bisections)")
+        
+        # Engine usage
+        for engine in ['google', 'bing', 'lingva', 'shell']:
+            count = self.stats[engine]
+            if count > 0:
+                percentage = (count / total_attempts) * 100
+                batch_info = " (BATCH ENGINE)" if engine in ['google', 'bing'] else ""
+                log_message(f"  {engine.title()}: {count} texts ({percentage:.1f}%){batch_info}")
+        
+        # Failed translations
+        failed = self.stats['failed']
+        if failed > 0:
+            percentage = (failed / total_attempts) * 100
+            log_message(f"  Failed: {failed} texts ({percentage:.1f}%)")
+        
+        # Blocking efficiency
+        blocked_saves = self.stats['blocked_saves']
+        if blocked_saves > 0:
+            log_message(f"  Blocked engine saves: {blocked_saves} unnecessary calls")
+        
+        # Hedged requests
+        if HEDGE_REQUESTS:
+            for engine_name in ['Google', 'Bing', 'Lingva', 'Shell']:
+                calls = self.primary_calls[engine_name]
+                if calls == 0 and self.hedge_wins[engine_name] == 0:
+                    continue
+                hedge_rate = (self.hedges[engine_name] / calls) * 100 if calls else 0
+                log_message(f"  🏁 {engine_name} hedging: {self.hedges[engine_name]}/{calls} hedged ({hedge_rate:.1f}%), "
+                            f"{self.hedge_wins[engine_name]} race wins, delay {self._hedge_delay(engine_name):.2f}s")
+        
+        # Load balancing
+        assigned = sum(self.balance_assigned.values())
+        if BALANCE_ENGINES and assigned:
+            shares = ', '.join(f"{engine.name} {self.balance_assigned[engine.name]} "
+                               f"({self.balance_assigned[engine.name] / assigned * 100:.0f}%, {self._balance_weight(engine, True):.1f} seg/s)"
+                               for engine in self.engines if self.balance_assigned[engine.name])
+            log_message(f"⚖️ Load balancing: {shares}")
+        
+        # Dynamic engine order
+        if DYNAMIC_ORDER and self.order:
+            current = ' → '.join(self.order)
+            log_message(f"🔀 Engine order: {current} ({self.reorders} reorders, {len(self.order_history)} leader changes shown)")
+            for name in self.order:
+                health = self._health(name)
+                if health['calls']:
+                    log_message(f"  {name}: {health['latency']:.2f}s/segment EWMA, {health['success'] * 100:.0f}% success EWMA "
+                                f"over {health['calls']} calls")
+            for timestamp, decision in self.order_history:
+                log_message(f"  [{timestamp}] {decision}")
+        
+        # Circuit breakers
+        for name, breaker in self.breakers.items():
+            transitions = breaker.stats['opened'] + breaker.stats['half_opened'] + breaker.stats['closed']
+            if transitions:
+                log_message(f"  🔁 {name} circuit {breaker.state}: opened {breaker.stats['opened']}x, "
+                            f"half-open {breaker.stats['half_opened']}x, closed {breaker.stats['closed']}x | "
+                            f"{breaker.stats['rejected']} calls skipped")
+        if self.engine_waits['waits']:
+            log_message(f"  ⏸️ No engine available: waited {self.engine_waits['wait_time']:.1f}s "
+                        f"in {self.engine_waits['waits']} waits")
+        if self.engine_waits['given_up']:
+            log_message(f"  🛑 Gave up on engines: {self.engine_waits['given_up']} segments left untranslated")
+        
+        # Success rates
+        log_message("📈 Engine Performance:")
+        for engine_name in ['Google', 'Bing', 'Lingva', 'Shell']:
+            successes = self.success_counts[engine_name]
+            failures = self.failure_counts[engine_name]
+            total = successes + failures
+            
+            if total > 0:
+                success_rate = (successes / total) * 100
+                state = self._breaker(engine_name).state
+                status = {CircuitBreaker.OPEN: "🚫 OPEN", CircuitBreaker.HALF_OPEN: "🟡 HALF-OPEN"}.get(state, "✅ Active")
+                log_message(f"  {engine_name}: {success_rate:.1f}% success ({successes}/{total}) {status}")
+        
+        self.print_timings()
+    
+    def print_timings(self):
+        """Stage histograms, slowest segments and files; also written to the session log"""
+        summary = TIMINGS.summary()
+        if not summary['stages']:
+            return
+        
+        log_message("⏱️ Stage timings:")
+        for stage, entry in sorted(summary['stages'].items(), key=lambda item: -item[1]['total']):
+            histogram = ' '.join(f"{_bucket_label(i)}:{count}" for i, count in enumerate(entry['buckets']) if count)
+            log_message(f"  {stage:<14} {entry['count']:>7} calls | total {entry['total']:8.2f}s | "
+                        f"mean {entry['total'] / entry['count'] * 1000:9.3f}ms | max {entry['max'] * 1000:9.3f}ms | {histogram}")
+        
+        if summary['slowest_segments']:
+            log_message("🐌 Slowest segments:")
+            for slow in summary['slowest_segments']:
+                # Packed batches are attributed to their first segment
+                first = slow['text'].split(BATCH_DELIMITER, 1)[0]
+                filename, line_num = self.logger.origins.get(slow['text']) or self.logger.origins.get(first) or ('?', '?')
+                segments = slow['text'].count(BATCH_DELIMITER) + 1
+                log_message(f"  {slow['seconds']:6.2f}s {slow['stage']} {filename}:{line_num} "
+                            f"({segments} segments) \"{first[:60]}\"")
+        
+        if summary['slowest_files']:
+            log_message("🐢 Slowest files:")
+            for slow in summary['slowest_files']:
+                log_message(f"  {slow['seconds']:8.2f}s {slow['file']}")
+        
+        self.logger.log_summary('stage_timings', summary)
+
+# ========== ENHANCED FILE PROCESSING ==========
+
+def plan_corpus(cores):
+    """Extract segments from all files first and collapse them to the unique set"""
+    plan = {
+        'files': {},          # filename -> list of segments in file order
+        'unique': {},         # segment -> occurrence count (first-seen order)
+        'last_file': {},      # segment -> last file that uses it (its translation can be dropped after)
+        'total_segments': 0
+    }
+    
+    for core in cores:
+        segments = core.collect_segments()
+        plan['files'][core.filename_base] = segments
+        plan['total_segments'] += len(segments)
+        for segment in segments:
+            plan['unique'][segment] = plan['unique'].get(segment, 0) + 1
+            plan['last_file'][segment] = core.filename_base
+    
+    total = plan['total_segments']
+    unique = len(plan['unique'])
+    duplicate_ratio = ((total - unique) / total) * 100 if total else 0
+    plan['calls_saved'] = total - unique
+    plan['duplicate_ratio'] = duplicate_ratio
+    
+    log_message(f"🧮 Corpus plan: {total} segments, {unique} unique ({duplicate_ratio:.1f}% duplicates)")
+    log_message(f"💡 Deduplication saves {plan['calls_saved']} engine calls")
+    return plan
+
+def translate_plan_file(plan, core, translator, translations):
+    """Translate the unique segments first seen in core's file once, adding them to translations"""
+    # Unique segments first seen in this file, sent as packed multi-segment requests
+    new_segments = []
+    for segment in plan['files'][core.filename_base]:
+        if segment not in translations:
+            translations[segment] = segment
+            new_segments.append(segment)
+    
+    if new_segments:
+        start = time.perf_counter()
+        if ASYNC_ENGINES:
+            translated_segments = asyncio.run(translator.translate_batch_async(new_segments))
+        else:
+            translated_segments = translator.translate_batch(new_segments)
+        for segment, translated in zip(new_segments, translated_segments):
+            translations[segment] = translated
+        if translator.memory:
+            translator.memory.flush()  # Per-segment fallbacks too, before the offline write pass
+        TIMINGS.record_file(core.filename_base, time.perf_counter() - start)
+    
+    plan['translated'] = plan.get('translated', 0) + len(new_segments)
+    total_unique = len(plan['unique'])
+    percent = (plan['translated'] / max(1, total_unique)) * 100
+    print(f"  {percent:.0f}% | {plan['translated']}/{total_unique} unique segments ({core.filename_base})")
+
+def release_plan_file(plan, core, translations):
+    """Drop translations no later file uses, so memory follows the files in progress, not the corpus"""
+    name = core.filename_base
+    for segment in plan['files'].pop(name, []):
+        if plan['last_file'].get(segment) == name:
+            del plan['last_file'][segment]
+            translations.pop(segment, None)
+
+def process_files(file_list, translate_function, translator):
+    """Process multiple files with comprehensive logging and batch management"""
+    print(f"🚀 Processing {len(file_list)} files...")
+    
+    
+    results = []
+    cores = []
+    
+    # Engines and files share the session logger, entries carry file and line
+    logger = translator.logger
+    for filename in file_list:
+        filepath = REPO_ROOT / "tl" / filename
+        cores.append(RenPyTranslatorCore(filepath, logger))
+    
+    file_translate_function = translate_function
+    plan = None
+    if DEDUP_CORPUS:
+        # Planning stage: unique segments are translated once, then fanned out per file
+        plan = plan_corpus(cores)
+        translations = {}
+        translator.stats['dedup_saves'] += plan['calls_saved']  # Per file in --workers mode
+        
+        def file_translate_function(text):
+            if text in translations:
+                return translations[text]
+            return translate_function(text)
+    
+    for renpy_translator in cores:
+        if plan:
+            # Engine work for this file right before it is written, so the journal and the
+            # streamed output keep up with the translations instead of waiting for the whole corpus
+            translate_plan_file(plan, renpy_translator, translator, translations)
+        
+        # Translated file is streamed to <output>/id/ and renamed into place when complete
+        output_filename = OUTPUT_DIR / "id" / f"{renpy_translator.filename_base}_translated.rpy"
+        
+        if ASYNC_ENGINES and not DEDUP_CORPUS:
+            result = asyncio.run(renpy_translator.process_file_async(translator.translate_single_async, output_filename))
+        else:
+            result = renpy_translator.process_file(file_translate_function, output_filename)
+        
+        if result:
+            print(f"💾 Saved: {output_filename}")
+            renpy_translator.journal.discard()
+            
+            # Session log is streamed; flush what this file produced
+            result['log_file'] = logger.save_session_log()
+            
+            results.append(result)
+        
+        if plan:
+            release_plan_file(plan, renpy_translator, translations)
+        
+        # NEW: Handle batch completion after each file
+        translator.handle_file_completed()
+        
+        print("-" * 50)
+    
+    print(f"🎉 Batch completed! {len(results)}/{len(file_list)} files processed successfully.")
+    return results
+
+# ========== LOCAL WORKER POOL ==========
+
+_WORKER = {}  # Long-lived translator of this worker process
+
+def _init_worker(shared_rate_state, output_dir, balance_engines):
+    """Pool initializer: join the shared rate buckets and build this worker's translator"""
+    global SHARED_RATE_STATE, OUTPUT_DIR, SCRIPT_NAME, BALANCE_ENGINES
+    SHARED_RATE_STATE = shared_rate_state
+    OUTPUT_DIR = output_dir
+    BALANCE_ENGINES = balance_engines
+    SCRIPT_NAME = f"translate_w{os.getpid()}.py"
+    
+    _WORKER['logger'] = TranslationLogger()
+    _WORKER['memory'] = TranslationMemory()
+    _WORKER['translator'] = SmartMultiEngineTranslator(_WORKER['logger'], _WORKER['memory'])
+    
+    # Pool workers leave through os._exit - finalizers are the only shutdown hook
+    multiprocessing.util.Finalize(None, _close_worker, exitpriority=10)
+
+def _close_worker():
+    _WORKER['translator'].print_stats()
+    _WORKER['translator'].close()
+    _WORKER['memory'].close()
+    _WORKER['logger'].close()
+
+def _worker_process_file(filename):
+    """Translate one file in a worker process; results go back to the parent"""
+    translator = _WORKER['translator']
+    results = process_files([filename], translator.translate_single, translator)
+    _WORKER['memory'].flush()
+    return [{key: result[key] for key in ('filename', 'output_file', 'mapping_file', 'log_file', 'stats')}
+            for result in results]
+
+def run_pool(files, workers):
+    """Spread files over a local process pool; engine rate limits are shared by all workers.
+    Each worker deduplicates its own file only - cross-file repeats are served by the shared
+    translation memory once the worker that translated them has flushed it."""
+    shared_rate_state = create_shared_rate_state()
+    log_message("🧮 Worker pool: segments deduplicated per file, cross-file repeats via translation memory")
+    
+    # Largest files first so no worker is left with a big file at the end
+    files = sorted(files, key=lambda name: (REPO_ROOT / "tl" / name).stat().st_size, reverse=True)
+    
+    results = []
+    pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(shared_rate_state, OUTPUT_DIR, BALANCE_ENGINES))
+    try:
+        for file_results in pool.imap_unordered(_worker_process_file, files):
+            results.extend(file_results)
+        pool.close()  # Workers exit normally and run their finalizers
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+    
+    return results
+
+def run_sequential(files):
+    """Translate all files in this process with one translator"""
+    session_logger = TranslationLogger()
+    memory = TranslationMemory()
+    log_message(f"🧠 Translation memory: {MEMORY_FILE}")
+    translator = SmartMultiEngineTranslator(session_logger, memory)
+    
+    try:
+        results = process_files(files, translator.translate_single, translator)
+        
+        # Print comprehensive statistics
+        translator.print_stats()
+        log_message(f"   Processed: {len(results)} files")
+        return results
+    finally:
+        translator.close()
+        memory.close()
+        session_logger.close()
+
+# ========== MAIN EXECUTION ==========
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Smart multi-engine RenPy translation pipeline")
+    parser.add_argument('--shard', type=int, action='append', default=[],
+                        help="Shard number from tl/scripts.txt (repeatable, default: all shards)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Local worker processes sharing engine rate limits (default: 1). With more than 1, "
+                             "segments are deduplicated per file; repeats across files come from the shared "
+                             "translation memory, so a segment two workers meet at once is translated twice")
+    parser.add_argument('--balance', action='store_true',
+                        help="Spread segments over all healthy engines instead of strict failover")
+    parser.add_argument('files', nargs='*',
+                        help="tl/ files to translate instead of the scripts.txt assignment")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Main execution function"""
+    global PATTERN, SCRIPT_NAME, OUTPUT_DIR, BALANCE_ENGINES
+    args = parse_args(argv)
+    BALANCE_ENGINES = BALANCE_ENGINES or args.balance
+    
+    # A single shard keeps the translateN.py names and output_N/ directory
+    if len(args.shard) == 1:
+        PATTERN = f"[{args.shard[0]}]"
+        SCRIPT_NAME = f"translate{args.shard[0]}.py"
+        OUTPUT_DIR = REPO_ROOT / f"output_{args.shard[0]}"
+    patterns = [f"[{shard}]" for shard in args.shard] or read_shard_patterns()
+    
+    log_message("🚀 Starting smart multi-engine translation pipeline...")
+    log_message(f"🧠 Smart blocking enabled: Failed engines are skipped, probed again after {BREAKER_COOLDOWN:.0f}s+, "
+                f"segments left untranslated after {BREAKER_GIVE_UP:.0f}s with no engine")
+    log_message("📝 Complete logging: TXT mappings + Session logs will be saved")
+    log_message(f"⏰ Rate config: start Shell={RATE_START_SHELL}/s, Others={RATE_START_OTHER}/s, adaptive (AIMD)")
+    log_message("🧊 Cooldowns: " + ', '.join(f"{name} pauses {seconds}s after {requests} requests"
+                                            for name, (requests, seconds) in ENGINE_COOLDOWNS.items())
+                + " (other engines keep going)")
+    log_message(f"🎯 Processing patterns: {', '.join(patterns) if not args.files else 'command line files'}")
+    log_message(f"👷 Workers: {args.workers} | Engines: {'load balanced' if BALANCE_ENGINES else 'cascade'} | Output: {OUTPUT_DIR}")
+    
+    # Read assigned files from tl/scripts.txt, each file once even if listed in two shards
+    if args.files:
+        my_files = list(dict.fromkeys(args.files))
+    else:
+        my_files = list(dict.fromkeys(filename for pattern in patterns for filename in read_my_tasks(pattern)))
+    log_message(f"📋 Found {len(my_files)} assigned files: {my_files}")
+    
+    if not my_files:
+        log_message(f"⚪ No files assigned to pattern {', '.join(patterns)}")
+        return
+    
+    # Check if files exist
+    existing_files = []
+    for filename in my_files:
+        filepath = REPO_ROOT / "tl" / filename
+        if filepath.exists():
+            existing_files.append(filename)
+        else:
+            log_message(f"⚠️ File not found: {filepath}")
+    
+    if not existing_files:
+        log_message("❌ No valid files found!")
+        return
+    
+    log_message(f"✅ Processing {len(existing_files)} valid files...")
+    
+    # Process files using smart blocking logic with batch management
+    try:
+        if args.workers > 1:
+            results = run_pool(existing_files, args.workers)
+        else:
+            results = run_sequential(existing_files)
+        
+        if results:
+            success = sum(result['stats']['success'] for result in results)
+            failed = sum(result['stats']['failed'] for result in results)
+            log_message(f"🎉 {SCRIPT_NAME} completed successfully!")
+            log_message(f"   Patterns: {', '.join(patterns)}")
+            log_message(f"   Files: {len(results)}/{len(existing_files)} | Segments: {success} translated, {failed} failed")
+            log_message("📁 Generated files:")
+            for result in results:
+                log_message(f"   - Translation: {result['output_file']}")
+                log_message(f"   - Mappings: {result['mapping_file']}")
+                if 'log_file' in result:
+                    log_message(f"   - Log: {result['log_file']}")
+        else:
+            log_message("❌ No files were processed successfully")
+            
+    except Exception as e:
+        log_message(f"❌ Fatal error: {e}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == "__main__":
+    main()